@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import tracemalloc
+
+# Add project root to sys.path
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from src.harvester.decoding import JsonDecoder, orjson
+from src.harvester.parser import EstateParser
+
+FIXTURE = os.path.join(BASE_DIR, "fixtures", "estates_page.json")
+
+
+def retained_bytes(decoder: JsonDecoder, payload: bytes) -> int:
+    """
+    Memory still held by one decoded page (what the cache / parser keep alive).
+    """
+    tracemalloc.start()
+    data = decoder.decode(payload)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return current
+
+
+def bench(label: str, decoder: JsonDecoder, payload: bytes, repeat: int) -> float:
+    parser = EstateParser()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        data = decoder.decode(payload)
+        parser.parse_page(data["_embedded"]["estates"])
+    elapsed = time.perf_counter() - start
+    per_page_ms = elapsed * 1000 / repeat
+    kb = retained_bytes(decoder, payload) / 1024
+    print(f"{label:<28} {per_page_ms:>7.2f} ms/page (decode+parse)  {kb:>8.1f} KiB retained/page")
+    return per_page_ms
+
+
+def main(repeat: int = 300):
+    with open(FIXTURE, "rb") as f:
+        payload = f.read()
+    
+    print(f"--- Decoding benchmark: {len(payload) / 1024:.0f} KiB page x {repeat} ---")
+    if orjson is None:
+        print("(orjson not installed - orjson rows skipped)")
+    
+    variants = [
+        ("stdlib json", JsonDecoder(use_orjson=False)),
+        ("stdlib json + projection", JsonDecoder(use_orjson=False, project=True)),
+    ]
+    if orjson is not None:
+        variants += [
+            ("orjson", JsonDecoder()),
+            ("orjson + projection", JsonDecoder(project=True)),
+        ]
+    
+    baseline = None
+    for label, decoder in variants:
+        ms = bench(label, decoder, payload, repeat)
+        baseline = baseline or ms
+        if ms != baseline:
+            print(f"{'':<28} {baseline / ms:.2f}x vs stdlib json")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -0,0 +1,58 @@
+import asyncio
+import os
+import sys
+import time
+
+# Add project root to sys.path
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import httpx
+
+from src.harvester.api_engine import SrealityApiEngine
+from src.harvester.replay import ReplayTransport
+from src.harvester.throttle import UpstreamLimiter
+
+# Recorded: search_apartments(region_id=10, region_type='region', limit=600) + 60 details
+ARCHIVE = os.path.join(BASE_DIR, "fixtures", "sreality_replay.jsonl.gz")
+SEARCH = {"region_id": 10, "region_type": "region", "limit": 600}
+
+
+def make_engine(latency: float, error_rate: float = 0.0) -> SrealityApiEngine:
+    transport = ReplayTransport(ARCHIVE, latency=latency, error_rate=error_rate, seed=42)
+    # No cache (we measure the network path) and a limiter that doesn't cap the replay
+    return SrealityApiEngine(
+        client=httpx.AsyncClient(transport=transport),
+        use_cache=False,
+        limiter=UpstreamLimiter(default_budget=(1000.0, 1000.0), backoff_base=0.01)
+    )
+
+
+async def timed(label: str, coro) -> float:
+    start = time.perf_counter()
+    result = await coro
+    elapsed = time.perf_counter() - start
+    size = len(result) if isinstance(result, list) else len(result.details)
+    print(f"{label:<36} {elapsed:>6.2f} s  ({size} items)")
+    return elapsed
+
+
+async def main(latency: float = 0.1):
+    print(f"--- Harvester replay benchmark: {latency * 1000:.0f} ms simulated latency ---")
+    engine = make_engine(latency)
+    sequential = await timed("search_apartments sequential", engine.search_apartments(concurrent=False, **SEARCH))
+    concurrent = await timed("search_apartments concurrent", engine.search_apartments(**SEARCH))
+    print(f"{'':<36} {sequential / concurrent:.1f}x")
+    
+    ads = await engine.search_apartments(**SEARCH)
+    hash_ids = [ad.hash_id for ad in ads[:60]]
+    await timed("get_listing_details (60)", engine.get_listing_details(hash_ids))
+    
+    # Resilience: 10% injected 503s, retried by the limiter
+    flaky = make_engine(latency, error_rate=0.1)
+    await timed("search_apartments, 10% errors", flaky.search_apartments(**SEARCH))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.1))
@@ -0,0 +1,87 @@
+import json
+import os
+import sys
+import time
+
+# Add project root to sys.path
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from src.harvester.models import RawPropertyAd
+from src.harvester.parser import EstateParser
+
+FIXTURE = os.path.join(BASE_DIR, "fixtures", "estates_page.json")
+
+
+def legacy_parse_item(item: dict) -> RawPropertyAd:
+    # Pre-EstateParser loop body (per-item import, map rebuild, on-the-fly regex)
+    layout_id_map = {2: "1+kk", 3: "1+1", 4: "2+kk", 5: "2+1", 6: "3+kk", 7: "3+1", 8: "4+kk", 9: "4+1"}
+    title = item.get("name", "Unknown")
+    loc = item.get("locality", "Unknown")
+    price = item.get("price", 0)
+    hash_id = item.get("hash_id")
+    seo = item.get("seo", {})
+    seo_loc = seo.get("locality")
+    cat_main = seo.get("category_main_cb", 1)
+    cat_slug_map = {1: "byt", 2: "dum", 3: "pozemek", 4: "rekreace", 5: "komercni"}
+    main_slug = cat_slug_map.get(cat_main, "byt")
+    cat_sub = seo.get("category_sub_cb", 1)
+    sub_slug = "ostatni"
+    if cat_main == 1:
+        sub_slug = layout_id_map.get(cat_sub, "vse")
+    elif cat_main == 2:
+        sub_slug = "rodinny"
+    elif cat_main == 3:
+        sub_slug = "bydleni"
+    elif cat_main == 4:
+        sub_slug = "chata"
+    elif cat_main == 5:
+        sub_slug = "kancelare"
+    import re
+    area = "0"
+    area_match = re.search(r'(\d+)\s*(?:m²|m2)', title, re.IGNORECASE)
+    if area_match:
+        area = area_match.group(1)
+    final_sub_slug = sub_slug
+    if cat_main == 1 and sub_slug not in layout_id_map.values():
+        final_sub_slug = "vse"
+    safe_loc = seo_loc if seo_loc else "unknown"
+    link = f"https://www.sreality.cz/detail/prodej/{main_slug}/{final_sub_slug}/{safe_loc}/{hash_id}"
+    layout = title
+    l_match = re.search(r'(\d+\+kk|\d+\+1|\d+\+0|1\+1|garsoniera)', title, re.IGNORECASE)
+    if l_match:
+        layout = l_match.group(1)
+    return RawPropertyAd(hash_id=hash_id, source_url=link, source_portal="sreality", title=title,
+                         price_raw=str(price), location_raw=loc, floor_area_raw=area, layout=layout)
+
+
+def bench(label: str, fn, items: list, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(items)
+    elapsed = time.perf_counter() - start
+    rate = len(items) * repeat / elapsed
+    print(f"{label:<28} {rate:>12,.0f} items/sec  ({elapsed * 1000:.1f} ms for {len(items) * repeat} items)")
+    return rate
+
+
+def main(repeat: int = 200):
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        items = json.load(f)["_embedded"]["estates"]
+    
+    parser = EstateParser()
+    
+    # Same output as the legacy loop (scraped_at aside)
+    exclude = {"scraped_at"}
+    assert [a.model_dump(exclude=exclude) for a in parser.parse_page(items)] == \
+           [legacy_parse_item(i).model_dump(exclude=exclude) for i in items]
+    
+    print(f"--- EstateParser benchmark: {len(items)} items/page x {repeat} ---")
+    legacy = bench("legacy per-item loop", lambda page: [legacy_parse_item(i) for i in page], items, repeat)
+    current = bench("EstateParser.parse_page", parser.parse_page, items, repeat)
+    print(f"Speedup: {current / legacy:.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -3,6 +3,7 @@ import os
 from loguru import logger
 from src.harvester.models import RawPropertyAd
 from src.cleaner.pipeline import DataCleaner
+from src.cleaner.frame import ListingFrame
 from src.cleaner.enrichment import Enricher
 from src.reporting.analysis import FinancialAnalyst
 from src.reporting.generator import ReportGenerator
@@ -14,9 +15,9 @@ async def main(input_limit: int = 3):
     # Using mock data to ensure "frontend" (Report) works immediately for user
     logger.info("Phase 1: Harvesting data...")
     raw_data = [
-        RawPropertyAd(source_url="http://sreality.cz/detail/1", source_portal="sreality", title="Nice Flat", price_raw="7 500 000 Kč", floor_area_raw="55 m2", layout="2+kk"),
-        RawPropertyAd(source_url="http://sreality.cz/detail/2", source_portal="sreality", title="Expensive One", price_raw="15 000 000 Kč", floor_area_raw="120 m2", layout="4+1"),
-        RawPropertyAd(source_url="http://sreality.cz/detail/3", source_portal="sreality", title="Cheap Fixer", price_raw="3 500 000 Kč", floor_area_raw="40 m2", layout="1+1"),
+        RawPropertyAd(hash_id=1, source_url="http://sreality.cz/detail/1", source_portal="sreality", title="Nice Flat", price_raw="7 500 000 Kč", floor_area_raw="55 m2", layout="2+kk"),
+        RawPropertyAd(hash_id=2, source_url="http://sreality.cz/detail/2", source_portal="sreality", title="Expensive One", price_raw="15 000 000 Kč", floor_area_raw="120 m2", layout="4+1"),
+        RawPropertyAd(hash_id=3, source_url="http://sreality.cz/detail/3", source_portal="sreality", title="Cheap Fixer", price_raw="3 500 000 Kč", floor_area_raw="40 m2", layout="1+1"),
     ]
     
     # 2. CLEAN & ENRICH
@@ -25,17 +26,13 @@ async def main(input_limit: int = 3):
     enricher = Enricher()
     analyst = FinancialAnalyst(min_yield_target=4.5)
     
-    final_results = []
-    
-    for raw in raw_data:
-        # Pipeline execution
-        clean = cleaner.process_ad(raw)
-        enriched = await enricher.enrich_location(clean)
-        
-        # 3. ANALYZE
-        metrics = analyst.evaluate(enriched)
+    # Columnar pipeline execution (models are rebuilt only for the report)
+    frame = cleaner.process_frame(ListingFrame.from_raw(raw_data))
+    await enricher.enrich_frame(frame)
         
-        final_results.append((enriched, metrics))
+    # 3. ANALYZE (one vectorized pass)
+    metrics_batch = analyst.evaluate_frame(frame)
+    final_results = list(zip(frame.to_clean_ads(), metrics_batch))
         
     # 4. REPORT
     logger.info("Phase 3: Generating Investment Memorandum...")
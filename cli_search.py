@@ -7,33 +7,21 @@ import re
 # Ensure src is in path
 sys.path.append(os.path.join(os.getcwd()))
 from src.harvester.api_engine import SrealityApiEngine
+from src.common.locations import KNOWN_LOCATIONS as BASE_LOCATIONS, REGION_IDS, WHOLE_COUNTRY_ID
 
 def slugify(text: str) -> str:
     text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('utf-8')
     return text.lower().replace(" ", "-")
 
+# Shared prompt keywords (src/common/locations.py) + city names searched as their whole region
+CITY_ALIASES = {
+    "budejovice": "jihocesky", "plzen": "plzensky", "vary": "karlovarsky", "usti": "ustecky",
+    "liberec": "liberecky", "hradec": "kralovehradecky", "pardubice": "pardubicky",
+    "olomouc": "olomoucky", "zlin": "zlinsky", "ostrava": "moravskoslezsky", "jihlava": "vysocina",
+}
 KNOWN_LOCATIONS = {
-    # Updated to match app.py logic
-    "ceska republika": (-99, 'region'), "cr": (-99, 'region'), "cz": (-99, 'region'),
-    
-    # Specific Cities
-    "brno": (72, 'district'),
-    
-    # Regions
-    "jihocesky": (1, 'region'), "budejovice": (1, 'region'),
-    "plzensky": (2, 'region'), "plzen": (2, 'region'),
-    "karlovarsky": (3, 'region'), "vary": (3, 'region'),
-    "ustecky": (4, 'region'), "usti": (4, 'region'),
-    "liberecky": (5, 'region'), "liberec": (5, 'region'),
-    "kralovehradecky": (6, 'region'), "hradec": (6, 'region'),
-    "pardubicky": (7, 'region'), "pardubice": (7, 'region'),
-    "olomoucky": (8, 'region'), "olomouc": (8, 'region'),
-    "zlinsky": (9, 'region'), "zlin": (9, 'region'),
-    "praha": (10, 'region'),
-    "stredocesky": (11, 'region'),
-    "moravskoslezsky": (12, 'region'), "ostrava": (12, 'region'),
-    "vysocina": (13, 'region'), "jihlava": (13, 'region'),
-    "jihomoravsky": (14, 'region'),
+    **BASE_LOCATIONS,
+    **{alias: (REGION_IDS[region], 'region') for alias, region in CITY_ALIASES.items()},
 }
 
 async def interactive_search():
@@ -62,7 +50,7 @@ async def interactive_search():
                     else:
                          r_id, r_type = val, 'region'
                     
-                    if r_id == -99:
+                    if r_id == WHOLE_COUNTRY_ID:
                         region_id = None
                     else:
                         region_id = r_id
@@ -81,18 +69,21 @@ async def interactive_search():
                  
             # Search
             print("   -> Fetching data...")
-            results = await engine.search_apartments(
+            found = 0
+            async for res in engine.iter_apartments(
                 region_id=region_id, 
                 region_type=region_type,
                 max_price=None, 
                 layouts=[]
-            )
+            ):
+                found += 1
+                # Print the first listings as soon as page 1 arrives
+                if found <= 5:
+                    print(f"      {found}. {res.title} | {res.price_raw} | {res.location_raw}")
             
-            print(f"   -> Found {len(results)} listings.")
-            for i, res in enumerate(results[:5]):
-                 print(f"      {i+1}. {res.title} | {res.price_raw} | {res.location_raw}")
-            if len(results) > 5:
+            if found > 5:
                 print("      ... and more.")
+            print(f"   -> Found {found} listings.")
             print("-" * 30)
             
     finally:
@@ -25,6 +25,7 @@ if sys.platform == 'win32':
 DB_ERROR = None
 try:
     from src.database.session import engine, Base
+    from src.database import models  # noqa: F401 - registers the tables on Base.metadata
     # Create Tables
     # This might fail if DB Connection is bad (Timeout, Password)
     Base.metadata.create_all(bind=engine)
@@ -46,8 +47,26 @@ try:
 except ImportError:
     generate_report_md = None
 
-app = FastAPI(title="RIA - Real Estate Investment Agent")
-app = FastAPI(title="RIA - Real Estate Investment Agent")
+from contextlib import asynccontextmanager
+from src.harvester.http_client import init_shared_client, close_shared_client
+from src.harvester.ingest_queue import get_ingestion_queue
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled HTTP client per process, shared by every SrealityApiEngine
+    await init_shared_client()
+    # Single ingestion worker; stop() flushes whatever is still buffered
+    await get_ingestion_queue().start()
+    try:
+        yield
+    finally:
+        await get_ingestion_queue().stop()
+        await close_shared_client()
+        if settings.DB_ASYNC:
+            from src.database.async_session import dispose_async_engine
+            await dispose_async_engine()
+
+app = FastAPI(title="RIA - Real Estate Investment Agent", lifespan=lifespan)
 
 
 
@@ -67,9 +86,11 @@ IMPORT_ERROR = None
 
 try:
     from src.harvester.api_engine import SrealityApiEngine
+    from src.harvester.throttle import CircuitOpenError
     from src.common.config import settings
     from src.harvester.models import RawPropertyAd
     from src.cleaner.pipeline import DataCleaner
+    from src.cleaner.frame import ListingFrame
     from src.cleaner.enrichment import Enricher
     from src.reporting.analysis import FinancialAnalyst
     from src.reporting.generator import ReportGenerator
@@ -141,10 +162,37 @@ async def analyze_property_endpoint(data: AnalyzeRequest, request: Request):
         return {"error": str(e)}
     finally:
         await engine.close()
-from fastapi import BackgroundTasks
+
+@app.get("/api/ingest/stats")
+async def ingest_stats():
+    """
+    Write-behind ingestion queue health: depth, lag and flush counters.
+    """
+    return get_ingestion_queue().stats()
+
+@app.get("/api/properties/{hash_id}/history")
+async def property_history(hash_id: int):
+    """
+    Price history of one listing (async DB session, does not block other requests).
+    """
+    from src.database.async_session import AsyncSessionLocal
+    from src.database.queries import PriceHistoryQueries
+    
+    async with AsyncSessionLocal() as db:
+        history = await PriceHistoryQueries(db).history_for([hash_id])
+    return {"hash_id": hash_id, "history": history[hash_id]}
+
+@app.get("/api/price-drops")
+async def price_drops(days: int = 7, location: str = None, limit: int = 100):
+    from src.database.async_session import AsyncSessionLocal
+    from src.database.queries import PriceHistoryQueries
+    
+    async with AsyncSessionLocal() as db:
+        drops = await PriceHistoryQueries(db).recent_price_drops(days=days, location=location, limit=limit)
+    return {"days": days, "location": location, "drops": drops}
 
 @app.post("/search", response_class=HTMLResponse)
-async def search(request: Request, background_tasks: BackgroundTasks, prompt: str = Form(...)):
+async def search(request: Request, prompt: str = Form(...)):
     if IMPORT_ERROR:
         return HTMLResponse(f"<h1>Startup Error</h1><pre>{IMPORT_ERROR}</pre>", status_code=500)
         
@@ -160,41 +208,8 @@ async def search(request: Request, background_tasks: BackgroundTasks, prompt: st
     prompt_slug = slugify(prompt)
     
     region_id = None
-    
-    # Map: Regions and Common Cities to Sreality Region IDs
-    # Format: "name": (ID, Type) where Type is 'region' or 'district'
-    # For backwards compatibility, plain integers are treated as 'region' (or heuristic)
-    known_locations = {
-        # Whole Country
-        "ceska republika": (-99, 'region'), "cr": (-99, 'region'), "cz": (-99, 'region'),
-        
-        # Major Cities (Districts) - Precise Search
-        # Praha & Brno are special/known
-        "praha": (10, 'region'), "praze": (10, 'region'), # Praha is unique (Region 10 = Capital)
-        "brno": (72, 'district'), "brne": (72, 'district'),
-
-        # Regions (Kraje) - ONLY map explicit Region names, NOT cities
-        "jihocesky": (1, 'region'), 
-        "plzensky": (2, 'region'),
-        "karlovarsky": (3, 'region'),
-        "ustecky": (4, 'region'),
-        "liberecky": (5, 'region'),
-        "kralovehradecky": (6, 'region'),
-        "pardubicky": (7, 'region'),
-        "olomoucky": (8, 'region'),
-        "zlinsky": (9, 'region'),
-        "stredocesky": (11, 'region'),
-        "moravskoslezsky": (12, 'region'),
-        "vysocina": (13, 'region'),
-        "jihomoravsky": (14, 'region'),
-
-        # Note: We REMOVED "ostrava", "plzen", "liberec", etc. from here.
-        # Why? Because mapping "ostrava" -> Region 12 (Moravskoslezsky) caused searching the WHOLE region.
-        # Now, "ostrava" will fall through to fuzzy/text search, setting region_text="ostrava",
-        # which Sreality API handles by searching just Ostrava (Correct).
-    }
-
-
+    # Region / city names aren't mapped to IDs here: they go through the fuzzy
+    # municipality / text search below ("ostrava" -> Region 12 would search the WHOLE region).
     
     # 1. Check for Specific Prague Districts first (Praha 1-10)
     import re
@@ -311,27 +326,34 @@ async def search(request: Request, background_tasks: BackgroundTasks, prompt: st
     engine = SrealityApiEngine()
 
     
+    raw_data = []
     try:
-        # Use Native Search
-        raw_data = await engine.search_apartments(
+        cleaner = DataCleaner()
+        enricher = Enricher()
+        analyst = FinancialAnalyst(min_yield_target=4.0)
+        if analyst.market_stats:
+            await analyst.market_stats.refresh() # DB load off the event loop
+        
+        # Use Native Search (streamed: page N is scored while page N+1 downloads)
+        async for page_ads in engine.iter_pages(
             region_id=region_id,
             region_type=region_type,
             max_price=price_max,
             layouts=layouts,
             region_text=target_location_filter,
             category_main=category_main
-        )
-        
-        cleaner = DataCleaner()
-        enricher = Enricher()
-        analyst = FinancialAnalyst(min_yield_target=4.0)
-        
-        for raw in raw_data:            
-            clean = cleaner.process_ad(raw)
-            enriched = await enricher.enrich_location(clean)
-            metrics = analyst.evaluate(enriched)
-            results.append({"ad": enriched, "metrics": metrics})
+        ):
+            raw_data.extend(page_ads)
+            # Columnar page: clean -> enrich -> score, models only for the template
+            frame = cleaner.process_frame(ListingFrame.from_raw(page_ads))
+            await enricher.enrich_frame(frame)
+            page_metrics = analyst.evaluate_frame(frame)
+            for enriched, metrics in zip(frame.to_clean_ads(), page_metrics):
+                results.append({"ad": enriched, "metrics": metrics})
     
+    except CircuitOpenError as e:
+        # Upstream went down mid-scan: keep the pages already scored
+        logger.warning(f"Search cut short, showing {len(results)} results: {e}")
     except Exception as e:
         logger.exception("Error during API pipeline execution")
         # Fail gracefully
@@ -339,26 +361,9 @@ async def search(request: Request, background_tasks: BackgroundTasks, prompt: st
     finally:
         await engine.close()
         
-    # Ingest Data in Background
+    # Ingest Data in Background (write-behind: coalesced with other searches, flushed in batches)
     if results:
-         # Need valid RawPropertyAd list. 'raw_data' is it.
-         # Session Handling: BackgroundTasks runs after response, so dependency injection of DB might be tricky if not careful.
-         # But we can instantiate a new session in the wrapper function.
-         
-         from src.database.session import SessionLocal
-         from src.harvester.ingestion import IngestionService
-         
-         def background_ingest(ads):
-             db = SessionLocal()
-             try:
-                 svc = IngestionService(db)
-                 svc.process_batch(ads)
-             except Exception as e:
-                 logger.error(f"Background Ingestion Failed: {e}")
-             finally:
-                 db.close()
-         
-         background_tasks.add_task(background_ingest, raw_data)
+         get_ingestion_queue().submit(raw_data)
 
     results.sort(key=lambda x: x["metrics"].gross_yield_percent, reverse=True)
     
@@ -1,4 +1,5 @@
 from src.cleaner.models import CleanPropertyAd
+from src.cleaner.frame import ListingFrame, float_column
 import random
 from loguru import logger
 
@@ -22,3 +23,17 @@ class Enricher:
         ad.district = "Praha - MockDistrict"
         
         return ad
+
+    async def enrich_frame(self, frame: ListingFrame) -> ListingFrame:
+        """
+        enrich_location for a whole ListingFrame (in place).
+        """
+        size = len(frame)
+        logger.debug(f"Geocoding {size} addresses...")
+        
+        frame.latitude = float_column([50.0755 + (random.random() - 0.5) * 0.1 for _ in range(size)])
+        frame.longitude = float_column([14.4378 + (random.random() - 0.5) * 0.1 for _ in range(size)])
+        frame.dist_center_km = float_column([round(random.uniform(1.0, 15.0), 1) for _ in range(size)])
+        frame.district = ["Praha - MockDistrict"] * size
+        
+        return frame
@@ -0,0 +1,150 @@
+import math
+import sys
+from typing import List, Optional, Sequence
+
+from src.cleaner.models import CleanPropertyAd, PropertyType
+from src.harvester.models import RawPropertyAd
+
+# NumPy (requirements.txt); without it numeric columns are plain lists (None = missing)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def float_column(values: Sequence[Optional[float]]):
+    """
+    float64 array with NaN for missing values (list with None without NumPy).
+    """
+    if np is not None:
+        return np.asarray(values, dtype=float)
+    return [None if value is None else float(value) for value in values]
+
+def plain_values(column) -> list:
+    """
+    Python values of a numeric column, NaN -> None (model edge).
+    """
+    values = column.tolist() if hasattr(column, "tolist") else list(column)
+    return [None if value is None or (isinstance(value, float) and math.isnan(value)) else value for value in values]
+
+def intern_column(values: Sequence[Optional[str]]) -> List[Optional[str]]:
+    # Localities / layouts repeat heavily within a scan: one string object each
+    return [sys.intern(value) if value else None for value in values]
+
+
+class ListingFrame:
+    """
+    Columnar batch of listings for the harvester -> cleaner -> analyst pipeline.
+    Numeric fields are arrays, locality / layout / portal are interned strings.
+    Pydantic models are only built at the edges (from_raw / from_clean / to_clean_ads).
+    """
+
+    NUMERIC = ("price_czk", "floor_area_m2", "price_per_m2", "latitude", "longitude", "dist_center_km")
+
+    def __init__(self,
+                 hash_id: Sequence[int],
+                 source_url: Sequence[str],
+                 source_portal: Sequence[str],
+                 title: Sequence[Optional[str]],
+                 locality: Sequence[Optional[str]],
+                 layout: Sequence[Optional[str]],
+                 images: Optional[Sequence[Optional[list]]] = None,
+                 price_raw: Optional[Sequence[Optional[str]]] = None,
+                 floor_area_raw: Optional[Sequence[Optional[str]]] = None,
+                 property_type: Optional[Sequence[PropertyType]] = None,
+                 **numeric):
+        size = len(hash_id)
+        self.hash_id = np.asarray(hash_id, dtype=np.int64) if np is not None else list(hash_id)
+        self.source_url = list(source_url)
+        self.source_portal = intern_column(source_portal)
+        self.title = list(title)
+        self.locality = intern_column(locality)
+        self.layout = intern_column(layout)
+        self.images = list(images) if images is not None else [None] * size
+        self.property_type = list(property_type) if property_type is not None else [PropertyType.UNKNOWN] * size
+
+        # Raw strings, only until DataCleaner.process_frame parses them
+        self.price_raw = list(price_raw) if price_raw is not None else None
+        self.floor_area_raw = list(floor_area_raw) if floor_area_raw is not None else None
+
+        # Numeric columns (missing -> NaN)
+        for name in self.NUMERIC:
+            values = numeric.get(name)
+            setattr(self, name, float_column(values if values is not None else [None] * size))
+
+        # District is produced by enrichment
+        self.district: List[Optional[str]] = [None] * size
+
+    def __len__(self) -> int:
+        return len(self.source_url)
+
+    @classmethod
+    def from_raw(cls, ads: Sequence[RawPropertyAd]) -> "ListingFrame":
+        """
+        Edge in: harvester output. Raw strings are kept for the cleaner.
+        """
+        return cls(
+            hash_id=[ad.hash_id for ad in ads],
+            source_url=[ad.source_url for ad in ads],
+            source_portal=[ad.source_portal for ad in ads],
+            title=[ad.title for ad in ads],
+            locality=[ad.location_raw for ad in ads],
+            layout=[ad.layout for ad in ads],
+            images=[ad.images for ad in ads],
+            price_raw=[ad.price_raw for ad in ads],
+            floor_area_raw=[ad.floor_area_raw for ad in ads]
+        )
+
+    @classmethod
+    def from_clean(cls, ads: Sequence[CleanPropertyAd], hash_ids: Optional[Sequence[int]] = None) -> "ListingFrame":
+        """
+        Edge in: already cleaned models (hash_id isn't part of CleanPropertyAd).
+        """
+        frame = cls(
+            hash_id=hash_ids if hash_ids is not None else [0] * len(ads),
+            source_url=[ad.source_url for ad in ads],
+            source_portal=[ad.source_portal for ad in ads],
+            title=[ad.title for ad in ads],
+            locality=[ad.locality for ad in ads],
+            layout=[ad.layout_normalized for ad in ads],
+            images=[ad.images for ad in ads],
+            property_type=[ad.property_type for ad in ads],
+            **{name: [getattr(ad, name) for ad in ads] for name in cls.NUMERIC}
+        )
+        frame.district = intern_column([ad.district for ad in ads])
+        return frame
+
+    def calculate_price_per_m2(self):
+        """
+        Column-wise CleanPropertyAd.calculate_price_per_m2.
+        """
+        if np is not None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                valid = (np.nan_to_num(self.price_czk) != 0) & (self.floor_area_m2 > 0)
+                self.price_per_m2 = np.where(valid, np.round(self.price_czk / self.floor_area_m2, 2), np.nan)
+            return
+        self.price_per_m2 = [
+            round(price / area, 2) if price and area and area > 0 else None
+            for price, area in zip(self.price_czk, self.floor_area_m2)
+        ]
+
+    def to_clean_ads(self, indices: Optional[Sequence[int]] = None) -> List[CleanPropertyAd]:
+        """
+        Edge out: CleanPropertyAd models (all rows, or `indices` in that order).
+        """
+        numeric = {name: plain_values(getattr(self, name)) for name in self.NUMERIC}
+        rows = range(len(self)) if indices is None else indices
+        ads = []
+        for i in rows:
+            ads.append(CleanPropertyAd(
+                source_url=self.source_url[i],
+                source_portal=self.source_portal[i],
+                title=self.title[i],
+                locality=self.locality[i],
+                images=self.images[i],
+                layout_normalized=self.layout[i],
+                property_type=self.property_type[i],
+                district=self.district[i],
+                **{name: values[i] for name, values in numeric.items()}
+            ))
+        return ads
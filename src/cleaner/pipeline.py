@@ -2,6 +2,7 @@ import re
 from loguru import logger
 from src.harvester.models import RawPropertyAd
 from src.cleaner.models import CleanPropertyAd, PropertyType
+from src.cleaner.frame import ListingFrame, float_column, intern_column
 
 class DataCleaner:
     @staticmethod
@@ -58,3 +59,18 @@ class DataCleaner:
         clean_ad.calculate_price_per_m2()
         
         return clean_ad
+
+    def process_frame(self, frame: ListingFrame) -> ListingFrame:
+        """
+        process_ad for a whole ListingFrame (in place). Drops the raw strings once parsed.
+        """
+        parse_price, parse_area = self.parse_price, self.parse_area
+        frame.price_czk = float_column([parse_price(price) for price in frame.price_raw or []])
+        frame.floor_area_m2 = float_column([parse_area(area) for area in frame.floor_area_raw or []])
+        frame.layout = intern_column([layout.strip() if layout else None for layout in frame.layout])
+        frame.property_type = [PropertyType.APARTMENT] * len(frame)
+        
+        # Derived metrics
+        frame.calculate_price_per_m2()
+        frame.price_raw = frame.floor_area_raw = None
+        return frame
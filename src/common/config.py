@@ -12,9 +12,74 @@ class Settings:
     # Will be overwritten by Supabase URL later
     # WARNING: Do not hardcode password here. Use .env
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    # Fallback when DATABASE_URL is unset: persistent SQLite file (Vercel only allows writes to /tmp)
+    SQLITE_PATH: str = os.getenv("SQLITE_PATH", "/tmp/ria.db" if os.getenv("VERCEL") else "ria.db")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL") # NORMAL is durable enough under WAL
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800")) # Postgres only
+    DB_ASYNC: bool = os.getenv("DB_ASYNC", "true").lower() in ("1", "true", "yes") # aiosqlite / asyncpg inside the event loop
 
 
 
+    # INGESTION
+    INGEST_USE_COPY: bool = os.getenv("INGEST_USE_COPY", "true").lower() in ("1", "true", "yes") # Postgres only
+    INGEST_COPY_MIN_ROWS: int = int(os.getenv("INGEST_COPY_MIN_ROWS", "1000"))
+    INGEST_QUEUE_BATCH: int = int(os.getenv("INGEST_QUEUE_BATCH", "500"))
+    INGEST_QUEUE_INTERVAL: float = float(os.getenv("INGEST_QUEUE_INTERVAL", "2.0"))
+    INGEST_QUEUE_MAX_PENDING: int = int(os.getenv("INGEST_QUEUE_MAX_PENDING", "20000")) # Ads beyond this are dropped
+    INGEST_QUEUE_MAX_RETRIES: int = int(os.getenv("INGEST_QUEUE_MAX_RETRIES", "3")) # Then the ad is dead-lettered
+
+    # SREALITY HTTP CLIENT (shared, pooled)
+    SREALITY_MAX_CONNECTIONS: int = int(os.getenv("SREALITY_MAX_CONNECTIONS", "20"))
+    SREALITY_MAX_KEEPALIVE: int = int(os.getenv("SREALITY_MAX_KEEPALIVE", "10"))
+    SREALITY_KEEPALIVE_EXPIRY: float = float(os.getenv("SREALITY_KEEPALIVE_EXPIRY", "30"))
+    SREALITY_HTTP2: bool = os.getenv("SREALITY_HTTP2", "false").lower() in ("1", "true", "yes")
+
+    # SREALITY RESPONSE CACHE
+    SREALITY_CACHE_ENABLED: bool = os.getenv("SREALITY_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    SREALITY_CACHE_MAX_ENTRIES: int = int(os.getenv("SREALITY_CACHE_MAX_ENTRIES", "512"))
+    SREALITY_CACHE_TTL_ESTATES: float = float(os.getenv("SREALITY_CACHE_TTL_ESTATES", "300"))
+    SREALITY_CACHE_TTL_DETAIL: float = float(os.getenv("SREALITY_CACHE_TTL_DETAIL", "3600"))
+    SREALITY_CACHE_DB: str = os.getenv("SREALITY_CACHE_DB", "") # e.g. "sreality_cache.db", empty = memory only
+
+    # SREALITY THROTTLING (per host, shared by all engines in the process)
+    SREALITY_RATE_PER_SEC: float = float(os.getenv("SREALITY_RATE_PER_SEC", "8"))
+    SREALITY_RATE_BURST: float = float(os.getenv("SREALITY_RATE_BURST", "16"))
+    SREALITY_MAX_RETRIES: int = int(os.getenv("SREALITY_MAX_RETRIES", "3"))
+    SREALITY_BACKOFF_BASE: float = float(os.getenv("SREALITY_BACKOFF_BASE", "0.5"))
+    SREALITY_BREAKER_THRESHOLD: int = int(os.getenv("SREALITY_BREAKER_THRESHOLD", "5"))
+    SREALITY_BREAKER_RESET: float = float(os.getenv("SREALITY_BREAKER_RESET", "30"))
+
+    # SREALITY DECODING
+    SREALITY_PROJECT_FIELDS: bool = os.getenv("SREALITY_PROJECT_FIELDS", "true").lower() in ("1", "true", "yes")
+
+    # SREALITY RECORD / REPLAY (offline benchmarks & tests)
+    SREALITY_RECORD_PATH: str = os.getenv("SREALITY_RECORD_PATH", "") # e.g. fixtures/my_run.jsonl.gz
+    SREALITY_REPLAY_PATH: str = os.getenv("SREALITY_REPLAY_PATH", "")
+    SREALITY_REPLAY_LATENCY: float = float(os.getenv("SREALITY_REPLAY_LATENCY", "0"))
+    SREALITY_REPLAY_ERROR_RATE: float = float(os.getenv("SREALITY_REPLAY_ERROR_RATE", "0"))
+
+    # BROWSER HARVESTER (Playwright)
+    HEADLESS: bool = os.getenv("HEADLESS", "true").lower() in ("1", "true", "yes")
+    BROWSER_POOL_SIZE: int = int(os.getenv("BROWSER_POOL_SIZE", "4"))
+    BROWSER_CONTEXT_MAX_USES: int = int(os.getenv("BROWSER_CONTEXT_MAX_USES", "50"))
+    BROWSER_LOAD_PROFILE: str = os.getenv("BROWSER_LOAD_PROFILE", "light") # light | full
+    HARVEST_WORKERS: int = int(os.getenv("HARVEST_WORKERS", "4"))
+    HARVEST_PER_DOMAIN: int = int(os.getenv("HARVEST_PER_DOMAIN", "4"))
+
+    # MARKET STATS (live price-per-m2 benchmarks from ingested listings)
+    MARKET_STATS_ENABLED: bool = os.getenv("MARKET_STATS_ENABLED", "true").lower() in ("1", "true", "yes")
+    MARKET_STATS_BUCKET: int = int(os.getenv("MARKET_STATS_BUCKET", "1000")) # Histogram bucket width, CZK/m2
+    MARKET_STATS_MAX_PPM2: int = int(os.getenv("MARKET_STATS_MAX_PPM2", "400000")) # Last bucket catches everything above
+    MARKET_STATS_WINDOW_DAYS: int = int(os.getenv("MARKET_STATS_WINDOW_DAYS", "30")) # Listings not seen for longer drop out
+    MARKET_STATS_TREND_DAYS: int = int(os.getenv("MARKET_STATS_TREND_DAYS", "7")) # Median snapshot interval for trends
+    MARKET_STATS_MIN_COUNT: int = int(os.getenv("MARKET_STATS_MIN_COUNT", "5")) # Below this the static market_data.json wins
+    MARKET_STATS_CACHE_TTL: float = float(os.getenv("MARKET_STATS_CACHE_TTL", "300"))
+
     # SECURITY
     SECRET_KEY: str = os.getenv("SECRET_KEY", "dev_secret_key_change_me_in_prod")
     ALGORITHM: str = "HS256"
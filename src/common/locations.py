@@ -0,0 +1,52 @@
+# Sreality locality IDs: sharded (whole-country) crawls and prompt parsing
+# (src/api/app.py, cli_search.py).
+
+# Kraje: locality_region_id
+REGION_IDS = {
+    "jihocesky": 1,
+    "plzensky": 2,
+    "karlovarsky": 3,
+    "ustecky": 4,
+    "liberecky": 5,
+    "kralovehradecky": 6,
+    "pardubicky": 7,
+    "olomoucky": 8,
+    "zlinsky": 9,
+    "praha": 10,
+    "stredocesky": 11,
+    "moravskoslezsky": 12,
+    "vysocina": 13,
+    "jihomoravsky": 14,
+}
+
+WHOLE_COUNTRY_ID = -99 # Prompt parsing: no locality filter
+BRNO_DISTRICT_ID = 72 # locality_district_id
+
+# Prompt keyword (slugified) -> (locality ID, 'region' | 'district')
+KNOWN_LOCATIONS = {
+    # Whole Country
+    "ceska republika": (WHOLE_COUNTRY_ID, "region"), "cr": (WHOLE_COUNTRY_ID, "region"), "cz": (WHOLE_COUNTRY_ID, "region"),
+    # Praha (region 10 = capital) and Brno (district)
+    "praha": (REGION_IDS["praha"], "region"), "praze": (REGION_IDS["praha"], "region"),
+    "brno": (BRNO_DISTRICT_ID, "district"), "brne": (BRNO_DISTRICT_ID, "district"),
+    # Regions (Kraje) by their own names only
+    **{name: (region_id, "region") for name, region_id in REGION_IDS.items()},
+}
+
+# Regional capitals / large cities -> REGION_IDS key (for per-region aggregates)
+CITY_REGIONS = {
+    "praha": "praha",
+    "brno": "jihomoravsky",
+    "ostrava": "moravskoslezsky",
+    "plzeň": "plzensky",
+    "liberec": "liberecky",
+    "olomouc": "olomoucky",
+    "české budějovice": "jihocesky",
+    "hradec králové": "kralovehradecky",
+    "ústí nad labem": "ustecky",
+    "pardubice": "pardubicky",
+    "zlín": "zlinsky",
+    "karlovy vary": "karlovarsky",
+    "jihlava": "vysocina",
+    "kladno": "stredocesky",
+}
@@ -0,0 +1,80 @@
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import StaticPool
+from src.common.config import settings
+from src.database.session import SQLALCHEMY_DATABASE_URL, _sqlite_pragmas
+
+try:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+except ImportError:
+    create_async_engine = None
+
+# Async drivers for the same database the sync engine points at
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg"
+}
+
+def to_async_url(url: str) -> str:
+    """
+    sqlite:///ria.db -> sqlite+aiosqlite:///ria.db, postgresql+psycopg2://... -> postgresql+asyncpg://...
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}'")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def build_async_engine(url: str) -> "AsyncEngine":
+    if create_async_engine is None:
+        raise RuntimeError("sqlalchemy[asyncio] is not installed")
+
+    async_url = to_async_url(url)
+    if async_url.startswith("sqlite"):
+        if ":memory:" in async_url:
+            # NOTE: a separate in-memory DB from the sync engine
+            return create_async_engine(async_url, poolclass=StaticPool)
+        # Same WAL / pragma tuning as the sync pool
+        async_engine = create_async_engine(
+            async_url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW
+        )
+        event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas)
+        return async_engine
+
+    return create_async_engine(
+        async_url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True
+    )
+
+# Created lazily: importing this module must not require aiosqlite/asyncpg
+_async_engine: Optional["AsyncEngine"] = None
+_async_sessionmaker = None
+
+def get_async_engine() -> "AsyncEngine":
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = build_async_engine(SQLALCHEMY_DATABASE_URL)
+    return _async_engine
+
+def AsyncSessionLocal() -> "AsyncSession":
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        _async_sessionmaker = async_sessionmaker(get_async_engine(), expire_on_commit=False, autoflush=False)
+    return _async_sessionmaker()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def dispose_async_engine():
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_sessionmaker = None
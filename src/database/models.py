@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum
+from sqlalchemy import BigInteger, Column, Integer, String, Boolean, DateTime, Enum, Text, Index
 from sqlalchemy.sql import func
 from .session import Base
 
@@ -11,7 +11,7 @@ class Property(Base):
     """
     __tablename__ = "properties"
 
-    hash_id = Column(Integer, primary_key=True, index=True) # Sreality unique ID
+    hash_id = Column(BigInteger, primary_key=True, index=True) # Sreality unique ID (exceeds INTEGER)
     source = Column(String, default="sreality") # sreality, idnes, etc.
     
     title = Column(String)
@@ -26,7 +26,7 @@ class Property(Base):
     
     # Timestamps
     first_seen_at = Column(DateTime(timezone=True), server_default=func.now())
-    last_seen_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now(), index=True) # Stale / delisted scans
     
     # Metadata / JSON
     raw_data = Column(String, nullable=True) # JSON store for future proofing
@@ -36,9 +36,62 @@ class PriceHistory(Base):
     Tracks price changes over time.
     """
     __tablename__ = "price_history"
+    __table_args__ = (
+        # Covers "history for these IDs (since X)"; also serves plain property_id lookups
+        Index("ix_price_history_property_detected", "property_id", "detected_at"),
+        # Time-window scans ("drops in the last 7 days")
+        Index("ix_price_history_detected_at", "detected_at"),
+    )
+    # On Postgres the table can be range-partitioned by month (src/scripts/migrate_price_history.py)
     
     id = Column(Integer, primary_key=True, index=True)
-    property_id = Column(Integer, index=True) # ForeignKey to Property.hash_id (but implicit for now to avoid complexity with BigInt PKs if different sources overlap. Using hash_id is fine for Sreality)
+    property_id = Column(BigInteger) # ForeignKey to Property.hash_id (but implicit for now to avoid complexity with BigInt PKs if different sources overlap. Using hash_id is fine for Sreality)
     price = Column(Integer)
     detected_at = Column(DateTime(timezone=True), server_default=func.now())
 
+
+class CrawlWatermark(Base):
+    """
+    Per-query state for incremental (delta) crawls.
+    """
+    __tablename__ = "crawl_watermarks"
+    
+    query_key = Column(String, primary_key=True) # Normalized search params (no tms/page)
+    seen = Column(Text, default="{}") # JSON {hash_id: fingerprint} of listings already ingested
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class MarketStat(Base):
+    """
+    Rolling price-per-m2 aggregate of active listings for one
+    area (district/city/region) x category x layout group.
+    Maintained by delta from ingestion (src/reporting/market_stats.py).
+    """
+    __tablename__ = "market_stats"
+    
+    group_key = Column(String, primary_key=True) # "level|area|category|layout"
+    level = Column(String) # district, city, region
+    area = Column(String, index=True) # Normalized name, e.g. "praha 2", "brno", "jihomoravsky"
+    category_main = Column(Integer)
+    layout = Column(String) # e.g. "2+kk", "*" = all layouts
+    
+    listing_count = Column(Integer, default=0)
+    histogram = Column(Text, default="{}") # JSON {bucket_index: count}
+    median_ppm2 = Column(Integer, nullable=True)
+    p25_ppm2 = Column(Integer, nullable=True)
+    p75_ppm2 = Column(Integer, nullable=True)
+    
+    # Trend: current median vs. the snapshot taken MARKET_STATS_TREND_DAYS ago
+    prev_median_ppm2 = Column(Integer, nullable=True)
+    snapshot_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class MarketStatsWatermark(Base):
+    """
+    Progress of the stale-listing expiry for market_stats.
+    """
+    __tablename__ = "market_stats_watermark"
+    
+    name = Column(String, primary_key=True) # "expiry"
+    expired_through = Column(DateTime(timezone=True)) # Listings last seen before this are no longer counted
@@ -0,0 +1,87 @@
+import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.models import Property, PriceHistory
+
+# Max IDs per IN (...) - stays below SQLite's bound-parameter limit
+HISTORY_CHUNK = 500
+
+
+class PriceHistoryQueries:
+    """
+    Async read side for listings and their price history.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_property(self, hash_id: int) -> Optional[Property]:
+        return await self.db.get(Property, hash_id)
+
+    async def history_for(self, hash_ids: List[int], since: Optional[datetime.datetime] = None) -> Dict[int, list]:
+        """
+        {hash_id: [{"price", "detected_at"}, ...]} oldest first, for many listings at once.
+        """
+        history: Dict[int, list] = {hash_id: [] for hash_id in hash_ids}
+        for i in range(0, len(hash_ids), HISTORY_CHUNK):
+            chunk = hash_ids[i:i + HISTORY_CHUNK]
+            stmt = (
+                select(PriceHistory.property_id, PriceHistory.price, PriceHistory.detected_at)
+                .where(PriceHistory.property_id.in_(chunk))
+                .order_by(PriceHistory.property_id, PriceHistory.detected_at)
+            )
+            if since is not None:
+                stmt = stmt.where(PriceHistory.detected_at >= since)
+            for property_id, price, detected_at in await self.db.execute(stmt):
+                history[property_id].append({"price": price, "detected_at": detected_at})
+        return history
+
+    async def recent_price_drops(self, days: int = 7, location: Optional[str] = None, limit: int = 100) -> List[dict]:
+        """
+        Price reductions detected in the last `days`, newest first.
+        location: optional substring of Property.location_raw (e.g. "Praha").
+        """
+        since = datetime.datetime.now() - datetime.timedelta(days=days)
+
+        # 1. Only listings with a history row in the window
+        recent_ids = select(PriceHistory.property_id).where(PriceHistory.detected_at >= since).distinct()
+
+        # 2. Previous price per row (may lie before the window)
+        lagged = (
+            select(
+                PriceHistory.property_id,
+                PriceHistory.price,
+                PriceHistory.detected_at,
+                func.lag(PriceHistory.price).over(
+                    partition_by=PriceHistory.property_id,
+                    order_by=PriceHistory.detected_at
+                ).label("previous_price")
+            )
+            .where(PriceHistory.property_id.in_(recent_ids))
+            .subquery()
+        )
+
+        # 3. Keep drops inside the window
+        stmt = (
+            select(lagged, Property.title, Property.location_raw)
+            .join(Property, Property.hash_id == lagged.c.property_id)
+            .where(lagged.c.detected_at >= since, lagged.c.previous_price > lagged.c.price)
+            .order_by(lagged.c.detected_at.desc())
+            .limit(limit)
+        )
+        if location:
+            stmt = stmt.where(Property.location_raw.ilike(f"%{location}%"))
+
+        drops = []
+        for row in await self.db.execute(stmt):
+            drops.append({
+                "hash_id": row.property_id,
+                "title": row.title,
+                "location": row.location_raw,
+                "previous_price": row.previous_price,
+                "price": row.price,
+                "drop_percent": round((row.previous_price - row.price) / row.previous_price * 100, 2) if row.previous_price else None,
+                "detected_at": row.detected_at
+            })
+        return drops
@@ -1,20 +1,58 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import QueuePool, StaticPool
 from src.common.config import settings
 
-# FORCE SQLITE (MEMORY) TO UNBLOCK VERCEL DEPLOYMENT
-# User requested to disconnect Supabase for now.
-# Data will be ephemeral (lost on restart), but app will run.
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# DATABASE_URL selects the backend (e.g. Supabase Postgres).
+# Without it we use a persistent SQLite file (ria.db, /tmp on Vercel).
+# "sqlite:///:memory:" is still accepted for throwaway runs.
+def resolve_database_url() -> str:
+    url = settings.DATABASE_URL or f"sqlite:///{settings.SQLITE_PATH}"
+    # Supabase/Heroku style URLs
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    return url
 
-connect_args = {"check_same_thread": False}
+SQLALCHEMY_DATABASE_URL = resolve_database_url()
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args=connect_args,
-    poolclass=NullPool
-)
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Per-connection tuning: WAL lets readers run alongside the ingestion writer.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}") # negative = KiB
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+def build_engine(url: str):
+    if url.startswith("sqlite"):
+        connect_args = {"check_same_thread": False}
+        if ":memory:" in url or url in ("sqlite://", "sqlite:///"):
+            # One shared connection, otherwise every session sees its own empty DB
+            return create_engine(url, connect_args=connect_args, poolclass=StaticPool)
+
+        db_engine = create_engine(
+            url,
+            connect_args=connect_args,
+            poolclass=QueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW
+        )
+        event.listen(db_engine, "connect", _sqlite_pragmas)
+        return db_engine
+
+    return create_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True
+    )
+
+engine = build_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -1,9 +1,19 @@
 import httpx
-from typing import List, Optional
+from typing import AsyncIterator, Dict, Iterable, List, Optional
 from loguru import logger
-from src.harvester.models import RawPropertyAd
+from src.harvester.models import ListingDetailBatch, RawPropertyAd
+from src.harvester.parser import EstateParser
+from src.harvester.decoding import JsonDecoder
+from src.common.config import settings
+from src.harvester.http_client import build_client, get_shared_client
+from src.harvester.cache import ResponseCache, get_default_cache
+from src.harvester.throttle import CircuitOpenError, UpstreamLimiter, get_default_limiter
 import time
+import math
 import asyncio
+import itertools
+import weakref
+from collections import deque
 
 class SrealityApiEngine:
     """
@@ -16,17 +26,40 @@ class SrealityApiEngine:
     CAT_MAIN_APARTMENTS = 1
     CAT_TYPE_SALE = 1
     
-    def __init__(self):
-        self.client = httpx.AsyncClient(
-            headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                "Accept": "application/json"
-            },
-            timeout=10.0
-        )
+    # Detail requests in flight per event loop, shared by all engines: concurrent
+    # callers asking for the same hash_id await one upstream request.
+    _inflight_details: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[int, asyncio.Future]]" = weakref.WeakKeyDictionary()
+    
+    def __init__(self, 
+                 max_concurrency: int = 8, 
+                 client: Optional[httpx.AsyncClient] = None,
+                 cache: Optional[ResponseCache] = None,
+                 use_cache: bool = True,
+                 limiter: Optional[UpstreamLimiter] = None,
+                 decoder: Optional[JsonDecoder] = None):
+        # Upper bound of parallel page requests in concurrent deep scans
+        self.max_concurrency = max_concurrency
+        
+        # Response cache (process-wide by default, so popular prompts are served locally)
+        self.cache = cache if cache is not None else (get_default_cache() if use_cache else None)
+        
+        # Rate limiting / retries / circuit breaking, shared process-wide by default
+        self.limiter = limiter or get_default_limiter()
+        
+        self.parser = EstateParser()
+        # orjson if available; estates pages projected to the fields EstateParser reads
+        self.decoder = decoder or JsonDecoder(project=settings.SREALITY_PROJECT_FIELDS)
+        
+        # Prefer the process-wide pooled client (keeps TLS sessions / keep-alive warm).
+        # Only a client we built ourselves is closed in close().
+        self.client = client or get_shared_client()
+        self._owns_client = self.client is None
+        if self._owns_client:
+            self.client = build_client()
         
     async def close(self):
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
         
     async def search_apartments(self, 
                               region_id: Optional[int] = None, 
@@ -36,13 +69,161 @@ class SrealityApiEngine:
                               layouts: List[int] = [],
                               limit: int = 20,
                               region_text: Optional[str] = None,
-                              category_main: int = 1) -> List[RawPropertyAd]:
+                              category_main: int = 1,
+                              concurrent: bool = True) -> List[RawPropertyAd]:
         """
         fetches properties from API.
         category_main: 1=Apt, 2=House, 3=Land, 4=Recreation, 5=Commercial
+        concurrent: fetch pages 2..N in parallel once the total is known (page 1).
         """
+        results = []
+        async for page_ads in self.iter_pages(
+            region_id=region_id,
+            region_type=region_type,
+            min_price=min_price,
+            max_price=max_price,
+            layouts=layouts,
+            limit=limit,
+            region_text=region_text,
+            category_main=category_main,
+            concurrent=concurrent
+        ):
+            results.extend(page_ads)
+            
+        logger.info(f"Total Fetched: {len(results)} items")
+        return results
+
+    async def iter_apartments(self, **search_kwargs) -> AsyncIterator[RawPropertyAd]:
+        """
+        Streams ads one by one as their page arrives.
+        Accepts the same keyword arguments as search_apartments.
+        """
+        async for page_ads in self.iter_pages(**search_kwargs):
+            for ad in page_ads:
+                yield ad
+
+    async def iter_pages(self, 
+                       region_id: Optional[int] = None, 
+                       region_type: Optional[str] = None,
+                       min_price: int = 0, 
+                       max_price: Optional[int] = None,
+                       layouts: List[int] = [],
+                       limit: int = 20,
+                       region_text: Optional[str] = None,
+                       category_main: int = 1,
+                       concurrent: bool = True,
+                       fresh: bool = False) -> AsyncIterator[List[RawPropertyAd]]:
+        """
+        Streams parsed ads page by page (in page order) as pages arrive,
+        so callers can clean/score page N while page N+1 is downloading.
+        In concurrent mode at most max_concurrency pages are in flight ahead
+        of the consumer, which keeps memory bounded on country-wide scans.
+        Raises CircuitOpenError when the upstream circuit opens mid-scan.
+        fresh=True skips fresh cache entries (revalidated / refetched instead).
+        """
+        params = self._build_params(region_id, region_type, min_price, max_price,
+                                    layouts, region_text, category_main)
+        url = f"{self.BASE_URL}/cs/v2/estates"
+        per_page = params["per_page"]
+        
+        # DEEP SCAN / PAGINATION LOGIC
+        # We fetch until we reach satisfy the 'limit' requested by caller.
+        # limit might be 200, 500, etc.
+        fetched_count = 0
         
-        # Build Params
+        try:
+            # 1. First page tells us how many results exist in total
+            logger.info(f"API Fetch Page 1 | fetched: 0/{limit}")
+            data = await self._fetch_page(url, params, 1, fresh)
+            items = data.get("_embedded", {}).get("estates", [])
+            page_ads = self._parse_items(items)[:limit]
+            fetched_count += len(page_ads)
+            yield page_ads
+            
+            total = data.get("result_size")
+            if not items or fetched_count >= limit:
+                return # Everything fits on the first page
+            
+            if concurrent and total:
+                # 2a. Fan out the remaining pages in parallel
+                last_page = math.ceil(min(limit, total) / per_page)
+                async for page_ads in self._iter_pages_concurrent(url, params, range(2, last_page + 1), fresh):
+                    page_ads = page_ads[:limit - fetched_count]
+                    fetched_count += len(page_ads)
+                    yield page_ads
+                return
+            
+            # 2b. Sequential fallback (no result_size or concurrency disabled)
+            # Pacing is handled by the shared limiter, no fixed sleep needed.
+            page = 2
+            while fetched_count < limit:
+                logger.info(f"API Fetch Page {page} | fetched: {fetched_count}/{limit}")
+                try:
+                    data = await self._fetch_page(url, params, page, fresh)
+                except CircuitOpenError:
+                    raise
+                except Exception as e:
+                    # Retries are exhausted for this page - skip it, keep scanning
+                    logger.error(f"API Error on page {page}: {e}")
+                    page += 1
+                    continue
+                items = data.get("_embedded", {}).get("estates", [])
+                
+                if not items:
+                    break # End of results
+                
+                page_ads = self._parse_items(items)[:limit - fetched_count]
+                fetched_count += len(page_ads)
+                yield page_ads
+                page += 1
+                
+        except CircuitOpenError:
+            # Upstream is down: stop the scan and tell the caller
+            raise
+        except Exception as e:
+            logger.error(f"API Error: {e}")
+
+    async def count_results(self, **search_kwargs) -> Optional[int]:
+        """
+        Total number of listings matching a search (from page 1's result_size).
+        Page 1 lands in the response cache, so a following scan reuses it.
+        """
+        params = self._build_params(
+            search_kwargs.get("region_id"), search_kwargs.get("region_type"),
+            search_kwargs.get("min_price", 0), search_kwargs.get("max_price"),
+            search_kwargs.get("layouts", []), search_kwargs.get("region_text"),
+            search_kwargs.get("category_main", 1)
+        )
+        data = await self._fetch_page(f"{self.BASE_URL}/cs/v2/estates", params, 1)
+        return data.get("result_size")
+
+    def query_key(self, 
+                  region_id: Optional[int] = None, 
+                  region_type: Optional[str] = None,
+                  min_price: int = 0, 
+                  max_price: Optional[int] = None,
+                  layouts: List[int] = [],
+                  region_text: Optional[str] = None,
+                  category_main: int = 1,
+                  **_ignored) -> str:
+        """
+        Stable identifier of a search (filters only, no paging / cache-buster).
+        """
+        params = self._build_params(region_id, region_type, min_price, max_price,
+                                    layouts, region_text, category_main)
+        return ResponseCache.make_key(f"{self.BASE_URL}/cs/v2/estates", params)
+
+    def _build_params(self, 
+                      region_id: Optional[int], 
+                      region_type: Optional[str],
+                      min_price: int, 
+                      max_price: Optional[int],
+                      layouts: List[int],
+                      region_text: Optional[str],
+                      category_main: int) -> dict:
+        """
+        Translates search filters into /estates query params.
+        """
         per_page = 60 # Max efficient size
         params = {
             "category_main_cb": category_main,
@@ -83,175 +264,161 @@ class SrealityApiEngine:
         if layouts:
             param_val = "|".join([str(l) for l in layouts])
             params["category_sub_cb"] = param_val
+            
+        return params
 
-        results = []
+    async def _fetch_page(self, url: str, params: dict, page: int, fresh: bool = False) -> dict:
+        """
+        Fetches a single page of the estates listing.
+        """
+        return await self._get_json(url, {**params, "page": page}, endpoint="estates", fresh=fresh)
+
+    async def _get_json(self, url: str, params: Optional[dict] = None, endpoint: str = "estates", fresh: bool = False):
+        """
+        GET + JSON decode through the response cache.
+        Fresh entries are served locally; stale ones are revalidated with
+        If-None-Match / If-Modified-Since when the upstream sent validators.
+        The returned data may be the cached object itself: don't mutate it.
+        fresh=True always asks the upstream (a 304 still reuses the cached data).
+        """
+        if self.cache is None:
+            resp = await self.limiter.get(self.client, url, params=params)
+            resp.raise_for_status()
+            return self.decoder.decode(resp.content, endpoint)
         
-        # Reverse map for link construction
-        layout_id_map = {
-            2: "1+kk", 3: "1+1",
-            4: "2+kk", 5: "2+1",
-            6: "3+kk", 7: "3+1",
-            8: "4+kk", 9: "4+1",
-        }
+        key = self.cache.make_key(url, params)
+        data = None if fresh else self.cache.get_fresh(key)
+        if data is not None:
+            return data
         
-        # DEEP SCAN / PAGINATION LOGIC
-        # We fetch until we reach satisfy the 'limit' requested by caller.
-        # limit might be 200, 500, etc.
+        entry = self.cache.lookup(key)
+        self.cache.record(hit=False)
+        headers = self.cache.conditional_headers(entry)
+        resp = await self.limiter.get(self.client, url, params=params, headers=headers)
         
-        page = 1
-        fetched_count = 0
+        if resp.status_code == 304 and entry is not None:
+            return self.cache.refresh(key, endpoint, entry, resp.headers).data
+        
+        resp.raise_for_status()
+        data = self.decoder.decode(resp.content, endpoint)
+        self.cache.store(key, endpoint, data, resp.headers)
+        return data
+
+    async def _iter_pages_concurrent(self, url: str, params: dict, pages: range, fresh: bool = False) -> AsyncIterator[List[RawPropertyAd]]:
+        """
+        Fetches the given pages in parallel and yields the parsed ads in page order.
+        A sliding window keeps at most max_concurrency requests in flight;
+        a failed page is logged and skipped, an open circuit aborts the scan.
+        """
+        async def fetch(page: int) -> List[RawPropertyAd]:
+            logger.info(f"API Fetch Page {page} (concurrent)")
+            data = await self._fetch_page(url, params, page, fresh)
+            return self._parse_items(data.get("_embedded", {}).get("estates", []))
+        
+        pending = iter(pages)
+        window = deque()
+        for page in itertools.islice(pending, self.max_concurrency):
+            window.append((page, asyncio.create_task(fetch(page))))
         
         try:
-            while fetched_count < limit:
-                # Check remaining
-                remaining = limit - fetched_count
-                # If remaining is small, we could adjust per_page, but simplest is to fetch 60 and slice.
+            while window:
+                page, task = window.popleft()
+                try:
+                    page_ads = await task
+                except CircuitOpenError:
+                    raise # finally cancels the rest of the window
+                except Exception as e:
+                    logger.error(f"API Error on page {page}: {e}")
+                    page_ads = None
                 
-                params["page"] = page
+                # Refill the window before handing the page to the consumer
+                next_page = next(pending, None)
+                if next_page is not None:
+                    window.append((next_page, asyncio.create_task(fetch(next_page))))
                 
-                url = f"{self.BASE_URL}/cs/v2/estates"
-                logger.info(f"API Fetch Page {page} | fetched: {fetched_count}/{limit}")
-                
-                resp = await self.client.get(url, params=params)
-                resp.raise_for_status()
-                
-                data = resp.json()
-                items = data.get("_embedded", {}).get("estates", [])
-                
-                if not items:
-                    break # End of results
-                
-                for item in items:
-                    if fetched_count >= limit:
-                        break
-                        
-                    # Parse Item
-                    title = item.get("name", "Unknown")
-                    loc = item.get("locality", "Unknown")
-                    price = item.get("price", 0)
-                    hash_id = item.get("hash_id")
-                    seo = item.get("seo", {})
-                    seo_loc = seo.get("locality")
-                    
-                    # Link Construction Logic
-                    # Map category_main_cb to URL slug
-                    # 1=byt, 2=dum, 3=pozemek, 4=rekreace, 5=komercni
-                    cat_main = seo.get("category_main_cb", 1)
-                    cat_slug_map = {
-                        1: "byt", 
-                        2: "dum", 
-                        3: "pozemek", 
-                        4: "rekreace", 
-                        5: "komercni"
-                    }
-                    main_slug = cat_slug_map.get(cat_main, "byt")
-                    
-                    # Layout/Type Slug
-                    # For Apts: 1+kk etc.
-                    # For Houses: rodinny, vila... based on sub_cb? 
-                    # Actually Sreality is forgiving. /prodej/dum/rodinny/... works.
-                    # If we don't know exact sub-type string, "unknown" might work or we need a sub-map.
-                    # Let's try to map common subs or keep it simple.
-                    # Actually, the layout_id_map I have (2->"1+kk") is only for Apts.
-                    # For simplicity, if it's not apt, we can put "vse" or "ostatni"?
-                    # Verification Needed: Does /prodej/dum/vse/... work?
-                    # Better: Parse title or define a sub-map.
-                    
-                    # Simplified Sub-Slug Logic (Verified)
-                    cat_sub = seo.get("category_sub_cb", 1) 
-                    
-                    sub_slug = "ostatni" # Universal Default
-                    
-                    if cat_main == 1: # Apartments
-                        # Map layout ID to slug
-                        # If sub_cb (e.g. 2->1+kk) is found, use it.
-                        # We use layout_id_map logic implicitly or we need a map.
-                        # Wait, layout_id_map maps 2->"1+kk" ? No, API maps layout IDs.
-                        # Let's trust my existing layout_id_map if defined, else 'vse'?
-                        # Actually for Apt, /byt/vse/ works usually.
-                        # But specific is better.
-                        # Assuming layout_id_map is defined in class scope or previously.
-                        # Let's use "vse" as safer default if map fails.
-                        sub_slug = layout_id_map.get(cat_sub, "vse")
-                        
-                    elif cat_main == 2: # Houses
-                        sub_slug = "rodinny" # Verified safe
-                        
-                    elif cat_main == 3: # Land
-                        sub_slug = "bydleni" # Verified safe (stavebni is 404)
-                        
-                    elif cat_main == 4: # Recreation
-                        sub_slug = "chata" # Verified safe
-                        
-                    elif cat_main == 5: # Commercial
-                        sub_slug = "kancelare" # Best guess, or 'obchodni'
-                        
-                    # Area & Layout Parsing
-                    import re
-                    area = "0"
-                    # Match: 50 m², 50m2, 50 m2
-                    area_match = re.search(r'(\d+)\s*(?:m²|m2)', title, re.IGNORECASE)
-                    if area_match:
-                        area = area_match.group(1)
-                    
-                    # Link Construction Robustness
-                    # Sreality Redirects if 'seo_loc' is present and ID is correct.
-                    # If seo_loc is missing, we use 'unknown', but we must ensure valid slugs.
-                    
-                    final_sub_slug = sub_slug
-                    # Special fix for Apartments: 1+kk needs to be URL safe? Browsers handle + ok usually.
-                    if cat_main == 1 and sub_slug not in layout_id_map.values():
-                        final_sub_slug = "vse"
-
-                    safe_loc = seo_loc if seo_loc else "unknown"
-                    
-                    link = f"https://www.sreality.cz/detail/prodej/{main_slug}/{final_sub_slug}/{safe_loc}/{hash_id}"
-                        
-                    layout = title
-                    l_match = re.search(r'(\d+\+kk|\d+\+1|\d+\+0|1\+1|garsoniera)', title, re.IGNORECASE)
-                    if l_match:
-                        layout = l_match.group(1)
+                if page_ads is not None:
+                    yield page_ads
+        finally:
+            # Consumer stopped early (break / error) - don't leak requests
+            for _, task in window:
+                task.cancel()
 
-                    
-                    ad = RawPropertyAd(
-                        hash_id=hash_id,
-                        source_url=link,
-                        source_portal="sreality",
-                        title=title,
-                        price_raw=str(price),
-                        location_raw=loc,
-                        floor_area_raw=area,
-                        layout=layout   
-                    )
-                    results.append(ad)
-                    fetched_count += 1
-                
-                page += 1
-                
-                # Safety Sleep to be nice
-                if limit > 60:
-                    await asyncio.sleep(0.1) 
-                    
-            logger.info(f"Total Fetched: {len(results)} items")
-                
-        except Exception as e:
-            logger.error(f"API Error: {e}")
-            
-        return results
+    def _parse_items(self, items: list) -> List[RawPropertyAd]:
+        """
+        Converts raw API estate items into RawPropertyAd objects.
+        """
+        return self.parser.parse_page(items)
 
     async def get_listing_detail(self, hash_id: int) -> Optional[str]:
         """
         Fetches full description text for a property.
         """
         try:
-            url = f"{self.BASE_URL}/cs/v2/estates/{hash_id}"
-            resp = await self.client.get(url)
-            if resp.status_code == 200:
-                data = resp.json()
-                # Text is usually in 'text_value' or 'description'
-                # Sreality API V2: name, text, items...
-                return data.get("text", {}).get("value", "")
+            data = await self._fetch_detail(hash_id)
+            return self._detail_text(data)
         except Exception as e:
             logger.error(f"Failed to fetch detail {hash_id}: {e}")
         return None
 
+    async def get_listing_details(self, hash_ids: Iterable[int], concurrency: Optional[int] = None) -> ListingDetailBatch:
+        """
+        Bulk description fetch: cache first, then bounded-concurrency requests
+        for the rest. Failed IDs are reported in .errors instead of raising.
+        """
+        batch = ListingDetailBatch()
+        pending = []
+        
+        # 1. Serve fresh cache entries directly (dict.fromkeys = dedupe, keep order)
+        for hash_id in dict.fromkeys(hash_ids):
+            cached = self.cache.get_fresh(self._detail_url(hash_id)) if self.cache else None
+            if cached is not None:
+                batch.details[hash_id] = self._detail_text(cached)
+            else:
+                pending.append(hash_id)
+        
+        cached_count = len(batch.details)
+        
+        # 2. Fetch the rest in parallel
+        semaphore = asyncio.Semaphore(concurrency or self.max_concurrency)
+        
+        async def fetch(hash_id: int) -> dict:
+            async with semaphore:
+                return await self._fetch_detail(hash_id)
+        
+        outcomes = await asyncio.gather(*(fetch(h) for h in pending), return_exceptions=True)
+        for hash_id, outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                batch.errors[hash_id] = str(outcome) or type(outcome).__name__
+            else:
+                batch.details[hash_id] = self._detail_text(outcome)
+        
+        logger.info(f"Details: {len(batch.details)} ok ({cached_count} cached), "
+                    f"{len(batch.errors)} failed")
+        return batch
+
+    def _detail_url(self, hash_id: int) -> str:
+        return f"{self.BASE_URL}/cs/v2/estates/{hash_id}"
+
+    @staticmethod
+    def _detail_text(data: dict) -> str:
+        # Text is usually in 'text_value' or 'description'
+        # Sreality API V2: name, text, items...
+        return (data.get("text") or {}).get("value", "")
+
+    async def _fetch_detail(self, hash_id: int) -> dict:
+        """
+        Detail JSON, deduplicated against identical requests already in flight.
+        """
+        inflight = SrealityApiEngine._inflight_details.setdefault(asyncio.get_running_loop(), {})
+        task = inflight.get(hash_id)
+        if task is None:
+            task = asyncio.ensure_future(self._get_json(self._detail_url(hash_id), endpoint="detail"))
+            inflight[hash_id] = task
+            
+            def forget(done: asyncio.Future):
+                if inflight.get(hash_id) is done:
+                    del inflight[hash_id]
+            task.add_done_callback(forget)
+        
+        # shield: one cancelled caller must not cancel the shared request
+        return await asyncio.shield(task)
@@ -0,0 +1,61 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.models import Property
+from src.harvester.ingestion import IngestionService, PREFETCH_CHUNK
+from src.harvester.models import RawPropertyAd
+from src.common.config import settings
+from loguru import logger
+
+
+class AsyncIngestionService:
+    """
+    Async twin of IngestionService for use inside the event loop.
+    Same diff and statements, awaited on an AsyncSession.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.market_stats = None
+        if settings.MARKET_STATS_ENABLED:
+            from src.reporting.market_stats import get_market_stats_updater
+            self.market_stats = get_market_stats_updater()
+
+    async def prefetch_prices(self, hash_ids: list) -> dict:
+        existing = {}
+        for i in range(0, len(hash_ids), PREFETCH_CHUNK):
+            chunk = hash_ids[i:i + PREFETCH_CHUNK]
+            rows = await self.db.execute(
+                select(Property.hash_id, Property.current_price).where(Property.hash_id.in_(chunk))
+            )
+            existing.update({hash_id: price for hash_id, price in rows})
+        return existing
+
+    async def process_batch(self, ads: list[RawPropertyAd]):
+        """
+        Upserts properties and tracks price history (one transaction).
+        """
+        ads_by_id = {ad.hash_id: ad for ad in ads}
+        if not ads_by_id:
+            return
+
+        # 1. Check existence (all at once)
+        existing = await self.prefetch_prices(list(ads_by_id))
+
+        # 2. Compute inserts / updates / price changes in memory
+        new_rows, updated_rows, history_rows = IngestionService.plan_batch(ads_by_id, existing)
+
+        # 3. Write everything in one transaction
+        dialect = self.db.get_bind().dialect.name
+        try:
+            if self.market_stats:
+                # Sync updater on the same connection/transaction
+                await self.db.run_sync(self.market_stats.apply, list(ads_by_id.values()))
+            for stmt, rows in IngestionService.write_statements(dialect, new_rows, updated_rows, history_rows):
+                await self.db.execute(stmt, rows)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+
+        count_price_changed = len(history_rows) - len(new_rows)
+        logger.info(f"Ingestion (async): New={len(new_rows)}, Upd={len(updated_rows)}, PriceChg={count_price_changed}")
@@ -0,0 +1,109 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+from loguru import logger
+from playwright.async_api import Browser, BrowserContext, Page
+
+# Use a real User-Agent to avoid "HeadlessChrome" detection
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+VIEWPORT = {"width": 1920, "height": 1080}
+# Stealth: Hide webdriver property
+STEALTH_SCRIPT = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+
+
+class PooledContext:
+    """
+    A warmed-up browser context with one reusable page.
+    """
+
+    def __init__(self, context: BrowserContext, page: Page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+
+    async def close(self):
+        try:
+            await self.context.close() # Closes its page too
+        except Exception as e:
+            logger.warning(f"Failed to close browser context: {e}")
+
+
+class ContextPool:
+    """
+    Bounded pool of pre-warmed contexts (UA, viewport and stealth script applied).
+    Pages are checked out / in; a context is recycled after max_uses checkouts
+    or when its page crashed, which keeps long-running harvests from growing.
+    """
+
+    def __init__(self, browser: Browser, size: int = 4, max_uses: int = 50):
+        self.browser = browser
+        self.size = size
+        self.max_uses = max_uses
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._all: List[PooledContext] = []
+        self._creating = 0 # Contexts being opened (count towards size)
+
+    async def start(self):
+        for pooled in await asyncio.gather(*(self._new_context() for _ in range(self.size))):
+            self._idle.put_nowait(pooled)
+        logger.info(f"Browser context pool ready ({self.size} contexts).")
+
+    async def _new_context(self) -> PooledContext:
+        self._creating += 1
+        try:
+            context = await self.browser.new_context(user_agent=USER_AGENT, viewport=VIEWPORT)
+            try:
+                await context.add_init_script(STEALTH_SCRIPT)
+                pooled = PooledContext(context, await context.new_page())
+            except Exception:
+                await PooledContext(context, None).close()
+                raise
+        finally:
+            self._creating -= 1
+        self._all.append(pooled)
+        return pooled
+
+    async def _recycle(self, pooled: PooledContext) -> Optional[PooledContext]:
+        """
+        Replaces a context with a fresh one. None if that failed:
+        the slot is refilled by a later checkout.
+        """
+        if pooled in self._all:
+            self._all.remove(pooled)
+        await pooled.close()
+        try:
+            return await self._new_context()
+        except Exception as e:
+            logger.warning(f"Context recycle failed: {e}")
+            return None
+
+    async def _checkout(self) -> PooledContext:
+        # Slots lost to failed recycles are refilled on demand
+        if self._idle.empty() and len(self._all) + self._creating < self.size:
+            return await self._new_context()
+        return await self._idle.get()
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """
+        Checks out a page (waits if every context is busy) and returns it afterwards.
+        """
+        pooled = await self._checkout()
+        healthy = True
+        try:
+            yield pooled.page
+        except Exception:
+            healthy = False # Page may be in a broken state
+            raise
+        finally:
+            pooled.uses += 1
+            if not healthy or pooled.page.is_closed() or pooled.uses >= self.max_uses:
+                pooled = await self._recycle(pooled)
+            if pooled is not None:
+                self._idle.put_nowait(pooled)
+
+    async def close(self):
+        await asyncio.gather(*(pooled.close() for pooled in self._all))
+        self._all.clear()
+        logger.info("Browser context pool closed.")
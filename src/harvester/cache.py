@@ -0,0 +1,275 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlencode
+
+from loguru import logger
+
+from src.common.config import settings
+
+# Query params that change on every call and must never split the cache
+VOLATILE_PARAMS = {"tms"}
+
+
+class CacheEntry:
+    """
+    A cached JSON response plus the validators needed to revalidate it.
+    """
+    __slots__ = ("data", "expires_at", "etag", "last_modified")
+
+    def __init__(self, data, expires_at: float, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        self.data = data
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def can_revalidate(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+class MemoryCache:
+    """
+    In-memory LRU tier. Expired entries are kept (until evicted) so they
+    can still be revalidated with ETag / Last-Modified.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SqliteCache:
+    """
+    Optional on-disk tier, survives restarts and is shared by processes on one box.
+    Writes are queued to one background thread, so callers on the event loop never
+    wait for SQLite (readers still find the entry in the memory tier meanwhile).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="http-cache-writer")
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS http_cache ("
+            " key TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, expires_at, etag, last_modified FROM http_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1], row[2], row[3])
+
+    def set(self, key: str, entry: CacheEntry):
+        """
+        Non-blocking: the write (JSON encoding included) runs on the writer thread.
+        """
+        # Snapshot the mutable fields, refresh() updates the entry in place
+        row = (key, entry.data, entry.expires_at, entry.etag, entry.last_modified)
+        self._writer.submit(self._write_row, row)
+
+    def _write_row(self, row: tuple):
+        key, data, expires_at, etag, last_modified = row
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO http_cache (key, data, expires_at, etag, last_modified) VALUES (?, ?, ?, ?, ?)",
+                    (key, json.dumps(data), expires_at, etag, last_modified)
+                )
+                self._conn.commit()
+        except Exception as e:
+            logger.warning(f"Cache disk write failed: {e}")
+
+    def flush(self):
+        """
+        Waits for the queued writes.
+        """
+        self._writer.submit(lambda: None).result()
+
+    def clear(self):
+        self.flush()
+        with self._lock:
+            self._conn.execute("DELETE FROM http_cache")
+            self._conn.commit()
+
+    def close(self):
+        self._writer.shutdown(wait=True)
+        self._conn.close()
+
+
+class ResponseCache:
+    """
+    Two-tier (memory LRU + optional SQLite) cache for Sreality JSON responses
+    with per-endpoint TTLs and conditional revalidation.
+    """
+    DEFAULT_TTLS = {
+        "estates": 300,   # search result pages move fast
+        "detail": 3600,   # descriptions rarely change
+    }
+
+    def __init__(self,
+                 memory: Optional[MemoryCache] = None,
+                 disk: Optional[SqliteCache] = None,
+                 ttls: Optional[Dict[str, float]] = None):
+        self.memory = memory if memory is not None else MemoryCache()
+        self.disk = disk
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Mapping] = None) -> str:
+        """
+        Stable key: URL + sorted params, without cache-buster params.
+        """
+        if not params:
+            return url
+        stable = sorted((k, str(v)) for k, v in params.items() if k not in VOLATILE_PARAMS)
+        return f"{url}?{urlencode(stable)}"
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """
+        Returns the entry (fresh or stale) from the fastest tier that has it.
+        """
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            try:
+                entry = self.disk.get(key)
+            except Exception as e:
+                logger.warning(f"Cache disk read failed: {e}")
+            if entry is not None:
+                self.memory.set(key, entry) # Promote
+        return entry
+
+    def get_fresh(self, key: str):
+        """
+        Returns cached data if it is still fresh (counted as a hit), else None.
+        The data is shared with the cache and later callers: treat it as read-only.
+        """
+        entry = self.lookup(key)
+        if entry is not None and entry.is_fresh():
+            self.record(hit=True)
+            return entry.data
+        return None
+
+    def record(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def store(self, key: str, endpoint: str, data, headers: Optional[Mapping] = None) -> CacheEntry:
+        headers = headers or {}
+        entry = CacheEntry(
+            data,
+            time.time() + self.ttls.get(endpoint, 60),
+            headers.get("etag"),
+            headers.get("last-modified")
+        )
+        self._write(key, entry)
+        return entry
+
+    def refresh(self, key: str, endpoint: str, entry: CacheEntry, headers: Optional[Mapping] = None) -> CacheEntry:
+        """
+        Upstream answered 304 - extend the lifetime of the entry we already hold.
+        """
+        headers = headers or {}
+        entry.expires_at = time.time() + self.ttls.get(endpoint, 60)
+        entry.etag = headers.get("etag") or entry.etag
+        entry.last_modified = headers.get("last-modified") or entry.last_modified
+        self.revalidated += 1
+        self._write(key, entry)
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "memory_entries": len(self.memory)
+        }
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def _write(self, key: str, entry: CacheEntry):
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, entry) # Queued, doesn't block the caller
+            except Exception as e:
+                logger.warning(f"Cache disk write failed: {e}")
+
+
+# Process-wide cache shared by every SrealityApiEngine
+_default_cache: Optional[ResponseCache] = None
+
+
+def get_default_cache() -> Optional[ResponseCache]:
+    """
+    Lazily builds the process-wide cache from settings (None if disabled).
+    """
+    global _default_cache
+    if not settings.SREALITY_CACHE_ENABLED:
+        return None
+    if _default_cache is None:
+        disk = SqliteCache(settings.SREALITY_CACHE_DB) if settings.SREALITY_CACHE_DB else None
+        _default_cache = ResponseCache(
+            memory=MemoryCache(settings.SREALITY_CACHE_MAX_ENTRIES),
+            disk=disk,
+            ttls={
+                "estates": settings.SREALITY_CACHE_TTL_ESTATES,
+                "detail": settings.SREALITY_CACHE_TTL_DETAIL
+            }
+        )
+    return _default_cache
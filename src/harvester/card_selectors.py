@@ -0,0 +1,59 @@
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+
+class CardSelectors(BaseModel):
+    """
+    Declarative selectors for search-result cards on one portal.
+    Each field is a fallback list: the first selector that matches wins.
+    """
+    card: List[str]
+    title: List[str]
+    price: List[str]
+    link: List[str]
+    locality: List[str]
+    base_url: str
+
+
+PORTAL_SELECTORS: Dict[str, CardSelectors] = {
+    "sreality": CardSelectors(
+        card=[".property", ".dir-property-list > div"],
+        title=["span.name", ".name"],
+        price=[".norm-price"],
+        link=["a.title", "a"],
+        locality=[".locality"],
+        base_url="https://www.sreality.cz"
+    ),
+}
+
+# Runs inside the page: extracts every card in a single CDP round-trip.
+# Returns [{title, price, href, locality}] for at most cfg.limit cards.
+EXTRACT_CARDS_JS = """
+(cfg) => {
+    const pick = (root, selectors) => {
+        for (const s of selectors) {
+            const el = root.querySelector(s);
+            if (el) return el;
+        }
+        return null;
+    };
+    let cards = [];
+    for (const s of cfg.card) {
+        cards = Array.from(document.querySelectorAll(s));
+        if (cards.length) break;
+    }
+    return cards.slice(0, cfg.limit).map((card) => {
+        const title = pick(card, cfg.title);
+        const price = pick(card, cfg.price);
+        const link = pick(card, cfg.link);
+        const locality = pick(card, cfg.locality);
+        return {
+            title: title ? title.innerText.trim() : "Unknown",
+            price: price ? price.innerText.trim() : "0",
+            href: link ? (link.getAttribute("href") || "") : "",
+            locality: locality ? locality.innerText.trim() : ""
+        };
+    });
+}
+"""
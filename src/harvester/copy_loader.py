@@ -0,0 +1,137 @@
+import csv
+import io
+from typing import Iterable, Iterator, List
+
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from src.common.config import settings
+from src.harvester.ingestion import IngestionService
+from src.harvester.models import RawPropertyAd
+
+STAGING_COLUMNS = ("hash_id", "source", "title", "location_raw", "current_price", "floor_area", "raw_data")
+
+CREATE_STAGING_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS staging_properties (
+    hash_id BIGINT PRIMARY KEY,
+    source TEXT,
+    title TEXT,
+    location_raw TEXT,
+    current_price BIGINT,
+    floor_area INTEGER,
+    raw_data TEXT
+) ON COMMIT DELETE ROWS
+"""
+
+COPY_SQL = f"COPY staging_properties ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+# One set-based statement: upsert properties and append price history.
+# All CTEs share one snapshot, so `prev` still sees the prices from before the upsert.
+MERGE_SQL = """
+WITH prev AS (
+    SELECT p.hash_id, p.current_price
+    FROM properties p
+    JOIN staging_properties s ON s.hash_id = p.hash_id
+),
+upserted AS (
+    INSERT INTO properties (hash_id, source, title, location_raw, current_price, floor_area, raw_data, first_seen_at, last_seen_at)
+    SELECT hash_id, source, title, location_raw, current_price, floor_area, raw_data, now(), now()
+    FROM staging_properties
+    ON CONFLICT (hash_id) DO UPDATE SET
+        title = EXCLUDED.title,
+        current_price = EXCLUDED.current_price,
+        last_seen_at = EXCLUDED.last_seen_at
+    RETURNING hash_id, current_price
+),
+history AS (
+    INSERT INTO price_history (property_id, price, detected_at)
+    SELECT u.hash_id, u.current_price, now()
+    FROM upserted u
+    LEFT JOIN prev ON prev.hash_id = u.hash_id
+    WHERE prev.hash_id IS NULL OR prev.current_price IS DISTINCT FROM u.current_price
+    RETURNING property_id
+)
+SELECT (SELECT count(*) FROM upserted), (SELECT count(*) FROM prev), (SELECT count(*) FROM history)
+"""
+
+
+class CsvRowStream:
+    """
+    File-like reader that renders CSV lines lazily, so COPY streams the batch
+    without building the whole payload in memory.
+    """
+
+    def __init__(self, rows: Iterable[tuple]):
+        self._lines = self._render(rows)
+        self._buffer = ""
+
+    @staticmethod
+    def _render(rows: Iterable[tuple]) -> Iterator[str]:
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        for row in rows:
+            writer.writerow(row)
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._lines)
+            except StopIteration:
+                break
+        if size < 0:
+            chunk, self._buffer = self._buffer, ""
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+class PostgresCopyIngestionService(IngestionService):
+    """
+    Loader backend for large ingests on Postgres: COPY FROM STDIN into a
+    staging table, then a single set-based merge. Small batches and other
+    dialects (SQLite) fall back to the ORM bulk path.
+    """
+
+    def __init__(self, db: Session, min_rows: int = 1000):
+        super().__init__(db)
+        self.min_rows = min_rows # Below this the temp-table round-trips don't pay off
+
+    def process_batch(self, ads: List[RawPropertyAd]):
+        if self.db.get_bind().dialect.name != "postgresql" or len(ads) < self.min_rows:
+            return super().process_batch(ads)
+        
+        ads_by_id = {ad.hash_id: ad for ad in ads} # Staging PK: last occurrence wins
+        
+        def rows() -> Iterator[tuple]:
+            for ad in ads_by_id.values():
+                price_val, area_val = self.parse_numbers(ad)
+                yield (ad.hash_id, ad.source_portal, ad.title, ad.location_raw, price_val, area_val, ad.json())
+        
+        try:
+            if self.market_stats:
+                self.market_stats.apply(self.db, ads_by_id.values())
+            # Raw DBAPI connection of the session's transaction (psycopg2)
+            dbapi_conn = self.db.connection().connection.driver_connection
+            with dbapi_conn.cursor() as cursor:
+                cursor.execute(CREATE_STAGING_SQL)
+                cursor.copy_expert(COPY_SQL, CsvRowStream(rows()))
+                cursor.execute(MERGE_SQL)
+                upserted, existed, history = cursor.fetchone()
+            self.db.commit() # ON COMMIT DELETE ROWS empties the staging table
+        except Exception:
+            self.db.rollback()
+            raise
+        
+        logger.info(f"Ingestion (COPY): New={upserted - existed}, Upd={existed}, PriceChg={history - (upserted - existed)}")
+
+
+def get_ingestion_service(db: Session) -> IngestionService:
+    """
+    Picks the ingestion backend for a session (COPY loader on Postgres if enabled).
+    """
+    if settings.INGEST_USE_COPY and db.get_bind().dialect.name == "postgresql":
+        return PostgresCopyIngestionService(db, min_rows=settings.INGEST_COPY_MIN_ROWS)
+    return IngestionService(db)
@@ -4,12 +4,31 @@ from loguru import logger
 from typing import List, Optional
 from src.common.config import settings
 from src.harvester.models import RawPropertyAd
+from src.harvester.browser_pool import ContextPool
+from src.harvester.card_selectors import EXTRACT_CARDS_JS, PORTAL_SELECTORS
+from src.harvester.parser import hash_id_from_url
+from src.harvester.load_profile import LoadProfile, PROFILES, apply_profile
+
+# Default ready selector (price block): short wait, listings "na vyžádání" have no price
+PRICE_SELECTOR = ".norm-price"
+PRICE_READY_TIMEOUT_MS = 3000
 
 class PlaywrightEngine:
-    def __init__(self, headless: bool = True):
+    def __init__(self, 
+                 headless: bool = True, 
+                 pool_size: Optional[int] = None, 
+                 max_context_uses: Optional[int] = None,
+                 load_profile: Optional[LoadProfile] = None):
         self.headless = headless
+        # Default page load profile, overridable per scrape
+        self.load_profile = load_profile or PROFILES.get(settings.BROWSER_LOAD_PROFILE, PROFILES["light"])
         self.browser: Optional[Browser] = None
         self.playwright = None
+        
+        # Pre-warmed contexts, checked out per scrape
+        self.pool: Optional[ContextPool] = None
+        self.pool_size = pool_size or settings.BROWSER_POOL_SIZE
+        self.max_context_uses = max_context_uses or settings.BROWSER_CONTEXT_MAX_USES
 
     async def start(self):
         self.playwright = await async_playwright().start()
@@ -20,26 +39,44 @@ class PlaywrightEngine:
                 "--window-position=-2400,-2400" 
             ]
         )
+        self.pool = ContextPool(self.browser, size=self.pool_size, max_uses=self.max_context_uses)
+        await self.pool.start()
         logger.info("Playwright engine started.")
 
     async def stop(self):
+        if self.pool:
+            await self.pool.close()
         if self.browser:
             await self.browser.close()
         if self.playwright:
             await self.playwright.stop()
         logger.info("Playwright engine stopped.")
 
-    async def scrape_detail(self, url: str) -> Optional[RawPropertyAd]:
+    async def scrape_detail(self, url: str, profile: Optional[LoadProfile] = None) -> Optional[RawPropertyAd]:
         """
         Scrapes a single detail page.
         """
-        if not self.browser:
+        if not self.pool:
             raise RuntimeError("Browser not started")
-            
-        page = await self.browser.new_page()
+        
+        profile = profile or self.load_profile
+        async with self.pool.page() as page, apply_profile(page, profile):
+            return await self._scrape_detail_page(page, url, profile)
+
+    async def _scrape_detail_page(self, page: Page, url: str, profile: LoadProfile) -> Optional[RawPropertyAd]:
         try:
             logger.info(f"Navigating to {url}")
-            await page.goto(url, timeout=30000)
+            await page.goto(url, timeout=30000, wait_until=profile.wait_until)
+            
+            # Early return: continue as soon as the profile's selector (or the price block) is rendered
+            if profile.ready_selector:
+                selector, timeout = profile.ready_selector, profile.ready_timeout_ms
+            else:
+                selector, timeout = PRICE_SELECTOR, min(profile.ready_timeout_ms, PRICE_READY_TIMEOUT_MS)
+            try:
+                await page.wait_for_selector(selector, timeout=timeout)
+            except Exception:
+                logger.warning(f"Ready selector not found on {url}, extracting what loaded")
             
             # Sreality specific selectors (simplified for MVP)
             # In production this needs robust selector management
@@ -49,13 +86,19 @@ class PlaywrightEngine:
             price_raw = "N/A"
             try:
                 # Common selector for Sreality detail price
-                price_el = await page.query_selector(".norm-price")
+                price_el = await page.query_selector(PRICE_SELECTOR)
                 if price_el:
                     price_raw = await price_el.inner_text()
             except:
                 pass
 
+            hash_id = hash_id_from_url(url)
+            if hash_id is None:
+                logger.warning(f"No listing ID in {url}, skipping")
+                return None
+
             raw_ad = RawPropertyAd(
+                hash_id=hash_id,
                 source_url=url,
                 source_portal="sreality",
                 title=title,
@@ -67,30 +110,29 @@ class PlaywrightEngine:
         except Exception as e:
             logger.error(f"Failed to scrape {url}: {e}")
             return None
-        finally:
-            await page.close()
 
-    async def scrape_search_results(self, search_url: str, limit: int = 5) -> List[RawPropertyAd]:
+    async def scrape_search_results(self, 
+                                    search_url: str, 
+                                    limit: int = 5, 
+                                    profile: Optional[LoadProfile] = None,
+                                    portal: str = "sreality") -> List[RawPropertyAd]:
         """
         Scrapes a list of properties from a search result page.
+        portal: key of PORTAL_SELECTORS describing the card markup.
         """
-        if not self.browser:
+        if not self.pool:
             raise RuntimeError("Browser not started")
             
-        # Use a real User-Agent to avoid "HeadlessChrome" detection
-        context = await self.browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            viewport={"width": 1920, "height": 1080}
-        )
-        # Stealth: Hide webdriver property
-        await context.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        
-        page = await context.new_page()
-        
+        # Pooled contexts already carry the real User-Agent, viewport and stealth script
+        profile = profile or self.load_profile
+        async with self.pool.page() as page, apply_profile(page, profile):
+            return await self._scrape_search_page(page, search_url, limit, profile, portal)
+
+    async def _scrape_search_page(self, page: Page, search_url: str, limit: int, profile: LoadProfile, portal: str) -> List[RawPropertyAd]:
         results = []
         try:
-            logger.info(f"Searching: {search_url}")
-            await page.goto(search_url, timeout=30000)
+            logger.info(f"Searching: {search_url} (profile: {profile.name})")
+            await page.goto(search_url, timeout=30000, wait_until=profile.wait_until)
             
             # 1. Handle Cookie Consent
             try:
@@ -102,19 +144,18 @@ class PlaywrightEngine:
             except Exception as e:
                 logger.warning(f"Cookie warning logic check failed: {e}")
 
-            # 2. Wait for content
+            # 2. Wait for content (returns as soon as the first card container exists)
             try:
-                # Wait longer for headless
-                await page.wait_for_selector(".property, .dir-property-list", timeout=20000)
+                await page.wait_for_selector(profile.ready_selector or ".property, .dir-property-list",
+                                             timeout=profile.ready_timeout_ms)
             except:
                 logger.error("Content did not load in time. Saving debug_timeout.png")
                 await page.screenshot(path="src/api/static/debug_timeout.png")
                 return []
             
-            # Select property cards
-            cards = await page.query_selector_all(".property")
-            if not cards:
-                 cards = await page.query_selector_all(".dir-property-list > div")
+            # 3. Extract all cards in one round-trip (instead of ~6 awaited calls per card)
+            selectors = PORTAL_SELECTORS[portal]
+            cards = await page.evaluate(EXTRACT_CARDS_JS, {**selectors.model_dump(), "limit": limit})
 
             logger.info(f"Found {len(cards)} card elements")
             
@@ -122,41 +163,29 @@ class PlaywrightEngine:
                 logger.warning("No cards found on page. Saving debug_empty.png")
                 await page.screenshot(path="src/api/static/debug_empty.png")
             
-            for i, card in enumerate(cards):
-                if i >= limit:
-                    break
-                    
-                # Extract basic info from card
+            for card in cards:
                 try:
-                    title_el = await card.query_selector("span.name")
-                    if not title_el: title_el = await card.query_selector(".name")
-                    title = await title_el.inner_text() if title_el else "Unknown"
-                    
-                    price_el = await card.query_selector(".norm-price")
-                    price = await price_el.inner_text() if price_el else "0"
-                    
-                    # Link
-                    link_el = await card.query_selector("a.title") 
-                    if not link_el: link_el = await card.query_selector("a")
-                        
-                    href = await link_el.get_attribute("href") if link_el else ""
+                    href = card["href"]
                     if href and not href.startswith("http"):
-                        href = "https://www.sreality.cz" + href
-                        
-                    loc_el = await card.query_selector(".locality")
-                    location = await loc_el.inner_text() if loc_el else ""
+                        href = selectors.base_url + href
+                    
+                    hash_id = hash_id_from_url(href)
+                    if hash_id is None:
+                        logger.warning(f"Card without listing ID skipped: {href}")
+                        continue
                     
-                    logger.info(f"Parsed: {title} | {price}")
+                    logger.info(f"Parsed: {card['title']} | {card['price']}")
                     
                     # Create Raw object
                     ad = RawPropertyAd(
+                        hash_id=hash_id,
                         source_url=href,
-                        source_portal="sreality",
-                        title=title,
-                        price_raw=price,
-                        location_raw=location,
-                        floor_area_raw=title, 
-                        layout=title          
+                        source_portal=portal,
+                        title=card["title"],
+                        price_raw=card["price"],
+                        location_raw=card["locality"],
+                        floor_area_raw=card["title"], 
+                        layout=card["title"]          
                     )
                     results.append(ad)
                     
@@ -168,8 +197,6 @@ class PlaywrightEngine:
         except Exception as e:
             logger.error(f"Search failed processing: {e}")
             return []
-        finally:
-            await page.close()
 
 if __name__ == "__main__":
     # Quick test
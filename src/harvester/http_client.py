@@ -0,0 +1,77 @@
+import importlib.util
+from typing import Optional
+
+import httpx
+from loguru import logger
+
+from src.common.config import settings
+from src.harvester.replay import transport_from_settings
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "application/json"
+}
+
+# Process-wide client, created/closed by the FastAPI lifespan (or a CLI entrypoint)
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+def build_client(max_connections: Optional[int] = None,
+                 max_keepalive_connections: Optional[int] = None,
+                 keepalive_expiry: Optional[float] = None,
+                 http2: Optional[bool] = None,
+                 timeout: float = 10.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """
+    Builds a pooled AsyncClient for the Sreality API.
+    Unset arguments fall back to the SREALITY_* settings
+    (including the record/replay transport, see src/harvester/replay.py).
+    """
+    limits = httpx.Limits(
+        max_connections=max_connections or settings.SREALITY_MAX_CONNECTIONS,
+        max_keepalive_connections=max_keepalive_connections or settings.SREALITY_MAX_KEEPALIVE,
+        keepalive_expiry=keepalive_expiry or settings.SREALITY_KEEPALIVE_EXPIRY
+    )
+    
+    use_http2 = settings.SREALITY_HTTP2 if http2 is None else http2
+    if use_http2 and importlib.util.find_spec("h2") is None:
+        # httpx needs the optional 'h2' package (pip install httpx[http2])
+        logger.warning("HTTP/2 requested but 'h2' is not installed. Falling back to HTTP/1.1.")
+        use_http2 = False
+    
+    # Pool limits / HTTP2 live on the transport; record mode wraps it, replay replaces it
+    pool = httpx.AsyncHTTPTransport(limits=limits, http2=use_http2)
+    
+    return httpx.AsyncClient(
+        headers=DEFAULT_HEADERS,
+        timeout=timeout,
+        transport=transport or transport_from_settings(settings, inner=pool) or pool
+    )
+
+
+async def init_shared_client(**client_kwargs) -> httpx.AsyncClient:
+    """
+    Creates the process-wide client (idempotent).
+    """
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = build_client(**client_kwargs)
+        logger.info("Shared Sreality HTTP client started.")
+    return _shared_client
+
+
+def get_shared_client() -> Optional[httpx.AsyncClient]:
+    """
+    Returns the process-wide client, or None if it was not initialised.
+    """
+    if _shared_client is None or _shared_client.is_closed:
+        return None
+    return _shared_client
+
+
+async def close_shared_client():
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
+        logger.info("Shared Sreality HTTP client closed.")
@@ -0,0 +1,226 @@
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+from sqlalchemy.exc import OperationalError
+
+from src.common.config import settings
+from src.harvester.models import RawPropertyAd
+
+
+def write_batch(batch: List[RawPropertyAd]):
+    """
+    Sync write of one batch in its own session (COPY loader on Postgres).
+    """
+    from src.database.session import SessionLocal
+    from src.harvester.copy_loader import get_ingestion_service
+    
+    db = SessionLocal()
+    try:
+        get_ingestion_service(db).process_batch(batch)
+    finally:
+        db.close()
+
+
+class IngestionQueue:
+    """
+    In-process write-behind queue for ingestion.
+    Many concurrent searches submit ads; one worker coalesces them (deduped by
+    hash_id within a flush window) and writes large batches on a size or time trigger.
+    A failed batch is split so the good rows still land; an ad that keeps failing
+    is moved to `dead_letter` after max_retries flushes.
+    """
+
+    def __init__(self,
+                 max_batch: int = 500,
+                 flush_interval: float = 2.0,
+                 use_async: bool = False,
+                 max_pending: int = 20000,
+                 max_retries: int = 3):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        # Async sessions write on the event loop; otherwise sync SQLAlchemy in a thread
+        self.use_async = use_async
+        
+        self._pending: Dict[int, RawPropertyAd] = {}
+        self._attempts: Dict[int, int] = {} # hash_id -> failed flushes
+        self.dead_letter = deque(maxlen=max_pending) # Ads that exhausted their retries
+        self._window_started: Optional[float] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._stopping = False
+        
+        # Stats
+        self.submitted = 0
+        self.coalesced = 0
+        self.written = 0
+        self.flushes = 0
+        self.failed_batches = 0
+        self.dropped = 0
+        self.last_flush_seconds = 0.0
+        self.last_lag_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._worker = asyncio.create_task(self._run())
+        logger.info(f"Ingestion queue started (batch={self.max_batch}, interval={self.flush_interval}s)")
+
+    async def stop(self):
+        """
+        Lets the worker finish its current flush and drain what is still pending.
+        Never cancels a write in progress.
+        """
+        if self._worker:
+            self._stopping = True
+            self._wakeup.set()
+            await self._worker
+            self._worker = None
+        await self.flush() # Not started, or the worker's last flush failed
+        if self._pending:
+            logger.error(f"Ingestion queue stopped with {len(self._pending)} unwritten ads")
+        logger.info(f"Ingestion queue stopped. {self.stats()}")
+
+    def submit(self, ads: Iterable[RawPropertyAd]):
+        """
+        Non-blocking: buffers ads for the next flush (last version of a hash_id wins).
+        New ads are dropped once max_pending ads are waiting.
+        """
+        dropped = 0
+        for ad in ads:
+            self.submitted += 1
+            if ad.hash_id in self._pending:
+                self.coalesced += 1
+            elif len(self._pending) >= self.max_pending:
+                dropped += 1
+                continue
+            self._pending[ad.hash_id] = ad
+        if dropped:
+            self.dropped += dropped
+            logger.warning(f"Ingestion queue full ({self.max_pending}, running={self.running}), dropped {dropped} ads")
+        if self._pending and self._window_started is None:
+            self._window_started = time.monotonic()
+        if len(self._pending) >= self.max_batch and self._wakeup:
+            self._wakeup.set()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        batch = list(self._pending.values())
+        self._pending = {}
+        lag = time.monotonic() - self._window_started if self._window_started else 0.0
+        self._window_started = None
+        
+        started = time.monotonic()
+        failed = await self._write_split(batch)
+        self.written += len(batch) - len(failed)
+        failed_ids = {ad.hash_id for ad in failed}
+        for ad in batch:
+            if ad.hash_id not in failed_ids:
+                self._attempts.pop(ad.hash_id, None)
+        if failed:
+            self.failed_batches += 1
+            self._requeue(failed, lag)
+        self.flushes += 1
+        self.last_flush_seconds = round(time.monotonic() - started, 3)
+        self.last_lag_seconds = round(lag, 3)
+
+    async def _write_split(self, batch: List[RawPropertyAd]) -> List[RawPropertyAd]:
+        """
+        Writes the batch, halving it on row errors so one bad ad doesn't block the rest.
+        Returns the ads that could not be written.
+        """
+        try:
+            if self.use_async:
+                await self._write_async(batch)
+            else:
+                # Sync SQLAlchemy - keep it off the event loop
+                await asyncio.to_thread(write_batch, batch)
+            return []
+        except Exception as e:
+            # Connection problems fail every row alike: no point in splitting
+            if len(batch) == 1 or isinstance(e, OperationalError):
+                logger.error(f"Ingestion queue write failed ({len(batch)} ads): {e}")
+                return batch
+        middle = len(batch) // 2
+        return await self._write_split(batch[:middle]) + await self._write_split(batch[middle:])
+
+    def _requeue(self, failed: List[RawPropertyAd], lag: float):
+        retried = 0
+        for ad in failed:
+            attempts = self._attempts.get(ad.hash_id, 0) + 1
+            if attempts >= self.max_retries:
+                self._attempts.pop(ad.hash_id, None)
+                self.dead_letter.append(ad)
+                logger.error(f"Ingestion queue: ad {ad.hash_id} failed {attempts} times, dead-lettered")
+                continue
+            # Newer versions submitted meanwhile win (and start with a clean slate)
+            if self._pending.setdefault(ad.hash_id, ad) is ad:
+                self._attempts[ad.hash_id] = attempts
+                retried += 1
+            else:
+                self._attempts.pop(ad.hash_id, None)
+        if retried:
+            logger.warning(f"Ingestion queue: {retried} ads retried next flush")
+        if self._pending and self._window_started is None:
+            self._window_started = time.monotonic() - lag
+
+    @staticmethod
+    async def _write_async(batch: list):
+        from src.database.async_session import AsyncSessionLocal
+        from src.harvester.async_ingestion import AsyncIngestionService
+        
+        async with AsyncSessionLocal() as db:
+            await AsyncIngestionService(db).process_batch(batch)
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "depth": len(self._pending),
+            "lag_seconds": round(time.monotonic() - self._window_started, 3) if self._window_started else 0.0,
+            "submitted": self.submitted,
+            "written": self.written,
+            "coalesced": self.coalesced,
+            "flushes": self.flushes,
+            "failed_batches": self.failed_batches,
+            "dropped": self.dropped,
+            "dead_letter": len(self.dead_letter),
+            "last_flush_seconds": self.last_flush_seconds,
+            "last_lag_seconds": self.last_lag_seconds
+        }
+
+
+# Process-wide queue, started/stopped by the FastAPI lifespan
+_ingestion_queue: Optional[IngestionQueue] = None
+
+
+def get_ingestion_queue() -> IngestionQueue:
+    global _ingestion_queue
+    if _ingestion_queue is None:
+        _ingestion_queue = IngestionQueue(
+            max_batch=settings.INGEST_QUEUE_BATCH,
+            flush_interval=settings.INGEST_QUEUE_INTERVAL,
+            use_async=settings.DB_ASYNC,
+            max_pending=settings.INGEST_QUEUE_MAX_PENDING,
+            max_retries=settings.INGEST_QUEUE_MAX_RETRIES
+        )
+    return _ingestion_queue
@@ -1,77 +1,181 @@
 import datetime
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from src.database.models import Property, PriceHistory
 from src.harvester.models import RawPropertyAd
+from src.common.config import settings
 from loguru import logger
 import json
 
+# Max IDs per IN (...) prefetch - stays below SQLite's bound-parameter limit
+PREFETCH_CHUNK = 500
+
 class IngestionService:
     def __init__(self, db: Session):
         self.db = db
+        # Live market benchmarks, maintained by delta in the ingestion transaction
+        self.market_stats = None
+        if settings.MARKET_STATS_ENABLED:
+            from src.reporting.market_stats import get_market_stats_updater
+            self.market_stats = get_market_stats_updater()
 
-    def process_batch(self, ads: list[RawPropertyAd]):
+    @staticmethod
+    def parse_numbers(ad: RawPropertyAd) -> tuple:
         """
-        Upserts properties and tracks price history.
+        Safe parsing of (price, floor_area) from raw strings.
+        """
+        try:
+            price_val = int(float(ad.price_raw)) if ad.price_raw else 0
+            area_val = int(ad.floor_area_raw) if ad.floor_area_raw and ad.floor_area_raw.isdigit() else None
+        except:
+            price_val = 0
+            area_val = None
+        return price_val, area_val
+
+    def prefetch_prices(self, hash_ids: list) -> dict:
+        """
+        {hash_id: current_price} for the IDs that already exist (one IN query per chunk).
+        """
+        existing = {}
+        for i in range(0, len(hash_ids), PREFETCH_CHUNK):
+            chunk = hash_ids[i:i + PREFETCH_CHUNK]
+            rows = self.db.execute(
+                select(Property.hash_id, Property.current_price).where(Property.hash_id.in_(chunk))
+            )
+            existing.update({hash_id: price for hash_id, price in rows})
+        return existing
+
+    @classmethod
+    def plan_batch(cls, ads_by_id: dict, existing: dict) -> tuple:
+        """
+        In-memory diff of a deduped batch against {hash_id: current_price}.
+        Returns (new_rows, updated_rows, history_rows); shared by the sync and async services.
         """
-        count_new = 0
-        count_updated = 0
-        count_price_changed = 0
-
-        for ad in ads:
-            # 1. Check existence
-            existing = self.db.query(Property).filter(Property.hash_id == ad.hash_id).first()
-            
-            # Safe parsing
-            try:
-                price_val = int(float(ad.price_raw)) if ad.price_raw else 0
-                area_val = int(ad.floor_area_raw) if ad.floor_area_raw and ad.floor_area_raw.isdigit() else None
-            except:
-                price_val = 0
-                area_val = None
-
-            if not existing:
+        now = datetime.datetime.now()
+        new_rows, updated_rows, history_rows = [], [], []
+
+        for hash_id, ad in ads_by_id.items():
+            price_val, area_val = cls.parse_numbers(ad)
+
+            if hash_id not in existing:
                 # CREATE
-                new_prop = Property(
-                    hash_id=ad.hash_id,
-                    source=ad.source_portal,
-                    title=ad.title,
-                    location_raw=ad.location_raw,
-                    # category_main etc. need to be passed or parsed? 
-                    # For now we might not have them in RawPropertyAd explicit fields?
-                    # ad.layout is present.
-                    current_price=price_val,
-                    floor_area=area_val,
-                    raw_data=ad.json()
-                )
-                self.db.add(new_prop)
-                self.db.commit() # Commit to get ID? hash_id is PK.
-                
+                new_rows.append({
+                    "hash_id": hash_id,
+                    "source": ad.source_portal,
+                    "title": ad.title,
+                    "location_raw": ad.location_raw,
+                    "current_price": price_val,
+                    "floor_area": area_val,
+                    "raw_data": ad.json(),
+                    "first_seen_at": now,
+                    "last_seen_at": now
+                })
                 # History Init
-                hist = PriceHistory(
-                    property_id=ad.hash_id,
-                    price=price_val
-                )
-                self.db.add(hist)
-                count_new += 1
+                history_rows.append({"property_id": hash_id, "price": price_val, "detected_at": now})
             else:
                 # UPDATE
-                existing.last_seen_at = datetime.datetime.now()
-                existing.title = ad.title # Update title if changed
-                
+                updated_rows.append({
+                    "hash_id": hash_id,
+                    "title": ad.title, # Update title if changed
+                    "current_price": price_val,
+                    "last_seen_at": now
+                })
+
                 # Check Price
-                if existing.current_price != price_val:
-                    logger.info(f"Price Change {existing.hash_id}: {existing.current_price} -> {price_val}")
-                    # Record History
-                    hist = PriceHistory(
-                        property_id=existing.hash_id,
-                        price=price_val
-                    )
-                    self.db.add(hist)
-                    
-                    existing.current_price = price_val
-                    count_price_changed += 1
-                
-                count_updated += 1
-        
-        self.db.commit()
-        logger.info(f"Ingestion: New={count_new}, Upd={count_updated}, PriceChg={count_price_changed}")
+                if existing[hash_id] != price_val:
+                    logger.info(f"Price Change {hash_id}: {existing[hash_id]} -> {price_val}")
+                    history_rows.append({"property_id": hash_id, "price": price_val, "detected_at": now})
+
+        return new_rows, updated_rows, history_rows
+
+    def process_batch(self, ads: list[RawPropertyAd]):
+        """
+        Upserts properties and tracks price history.
+        Bulk path: one prefetch, in-memory diff, set-based writes, a single commit.
+        """
+        # Last occurrence wins if the same listing appears twice in one batch
+        ads_by_id = {ad.hash_id: ad for ad in ads}
+        if not ads_by_id:
+            return
+
+        # 1. Check existence (all at once)
+        existing = self.prefetch_prices(list(ads_by_id))
+
+        # 2. Compute inserts / updates / price changes in memory
+        new_rows, updated_rows, history_rows = self.plan_batch(ads_by_id, existing)
+
+        # 3. Write everything in one transaction (market stats first: they diff against the old rows)
+        try:
+            if self.market_stats:
+                self.market_stats.apply(self.db, ads_by_id.values())
+            self._write(new_rows, updated_rows, history_rows)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        count_price_changed = len(history_rows) - len(new_rows)
+        logger.info(f"Ingestion: New={len(new_rows)}, Upd={len(updated_rows)}, PriceChg={count_price_changed}")
+
+    def touch_seen(self, ads: list[RawPropertyAd]):
+        """
+        Marks known listings that were seen unchanged as still live (last_seen_at only).
+        """
+        existing = self.prefetch_prices(list({ad.hash_id for ad in ads}))
+        ads_by_id = {ad.hash_id: ad for ad in ads if ad.hash_id in existing}
+        if not ads_by_id:
+            return
+        now = datetime.datetime.now()
+        hash_ids = list(ads_by_id)
+        try:
+            if self.market_stats:
+                # Re-counts listings that already dropped out of the stats window
+                self.market_stats.apply(self.db, ads_by_id.values())
+            for i in range(0, len(hash_ids), PREFETCH_CHUNK):
+                self.db.execute(
+                    update(Property)
+                    .where(Property.hash_id.in_(hash_ids[i:i + PREFETCH_CHUNK]))
+                    .values(last_seen_at=now)
+                )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def _write(self, new_rows: list, updated_rows: list, history_rows: list):
+        dialect = self.db.get_bind().dialect.name
+        for stmt, rows in self.write_statements(dialect, new_rows, updated_rows, history_rows):
+            self.db.execute(stmt, rows)
+
+    @staticmethod
+    def write_statements(dialect: str, new_rows: list, updated_rows: list, history_rows: list) -> list:
+        """
+        [(statement, rows)] executemany pairs for one batch.
+        """
+        statements = []
+        if new_rows:
+            if dialect in ("postgresql", "sqlite"):
+                # INSERT ... ON CONFLICT: safe if another writer added the row after our prefetch
+                dialect_insert = pg_insert if dialect == "postgresql" else sqlite_insert
+                stmt = dialect_insert(Property)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[Property.hash_id],
+                    set_={
+                        "title": stmt.excluded.title,
+                        "current_price": stmt.excluded.current_price,
+                        "last_seen_at": stmt.excluded.last_seen_at
+                    }
+                )
+                statements.append((stmt, new_rows))
+            else:
+                statements.append((insert(Property), new_rows))
+
+        if updated_rows:
+            # ORM bulk UPDATE by primary key (executemany)
+            statements.append((update(Property), updated_rows))
+
+        if history_rows:
+            statements.append((insert(PriceHistory), history_rows))
+        return statements
@@ -0,0 +1,68 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from loguru import logger
+from playwright.async_api import Page, Route
+from pydantic import BaseModel
+
+
+class LoadProfile(BaseModel):
+    """
+    How much of a page a scrape loads and when it considers the page ready.
+    """
+    name: str = "full"
+    blocked_resource_types: Set[str] = set() # Playwright resource types: image, media, font, stylesheet...
+    block_third_party: bool = False
+    # Hosts treated as first-party (sreality runs on Seznam infrastructure)
+    first_party_hosts: Tuple[str, ...] = ("sreality.cz", "seznam.cz", "sdn.cz", "szn.cz")
+    wait_until: str = "load" # goto() wait: load, domcontentloaded, commit
+    ready_selector: Optional[str] = None # Return as soon as this shows up (None = page default)
+    ready_timeout_ms: int = 20000
+
+    def is_first_party(self, url: str) -> bool:
+        host = urlsplit(url).hostname or ""
+        return any(host == h or host.endswith("." + h) for h in self.first_party_hosts)
+
+
+FULL_PROFILE = LoadProfile()
+
+LIGHT_PROFILE = LoadProfile(
+    name="light",
+    blocked_resource_types={"image", "media", "font"},
+    block_third_party=True, # ads, trackers, analytics
+    wait_until="domcontentloaded",
+    ready_timeout_ms=10000
+)
+
+PROFILES = {p.name: p for p in (FULL_PROFILE, LIGHT_PROFILE)}
+
+
+@asynccontextmanager
+async def apply_profile(page: Page, profile: LoadProfile) -> AsyncIterator[None]:
+    """
+    Installs request interception for one scrape and removes it afterwards
+    (pages are pooled, so handlers must not leak into the next scrape).
+    """
+    if not profile.blocked_resource_types and not profile.block_third_party:
+        yield
+        return
+    
+    blocked = 0
+    
+    async def handle(route: Route):
+        nonlocal blocked
+        request = route.request
+        if request.resource_type in profile.blocked_resource_types or \
+                (profile.block_third_party and not profile.is_first_party(request.url)):
+            blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    await page.route("**/*", handle)
+    try:
+        yield
+    finally:
+        await page.unroute("**/*", handle)
+        logger.debug(f"Load profile '{profile.name}': blocked {blocked} requests")
@@ -1,25 +1,143 @@
 import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
 from loguru import logger
 from src.harvester.engine import PlaywrightEngine
+from src.harvester.ingest_queue import write_batch
+from src.harvester.models import RawPropertyAd
 from src.common.config import settings
 
-async def run_harvester(urls: list[str]):
+
+class IngestionSink:
+    """
+    Streams harvested ads into IngestionService in batches
+    instead of collecting everything in memory.
+    A failed write keeps the ads buffered and is retried with the next batch.
+    """
+
+    def __init__(self, batch_size: int = 100):
+        self.batch_size = batch_size
+        self.buffer: List[RawPropertyAd] = []
+        self.written = 0
+        self.failed_writes = 0
+        self._flush_at = batch_size
+        self._lock = asyncio.Lock()
+
+    async def add(self, ad: RawPropertyAd):
+        self.buffer.append(ad)
+        if len(self.buffer) >= self._flush_at:
+            await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            if not self.buffer:
+                return
+            batch = list(self.buffer)
+            try:
+                # Sync SQLAlchemy - keep it off the event loop
+                await asyncio.to_thread(write_batch, batch)
+            except Exception as e:
+                self.failed_writes += 1
+                self._flush_at = len(self.buffer) + self.batch_size # Retry after the next batch
+                logger.error(f"Ingestion sink write failed ({len(batch)} ads kept for retry): {e}")
+                return
+            # Ads added while the write was running stay buffered
+            del self.buffer[:len(batch)]
+            self._flush_at = self.batch_size
+            self.written += len(batch)
+
+    async def close(self):
+        await self.flush()
+        if self.buffer:
+            logger.error(f"Ingestion sink closed with {len(self.buffer)} unwritten ads")
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "written": self.written,
+            "unwritten": len(self.buffer),
+            "failed_writes": self.failed_writes
+        }
+
+
+class HarvestProgress:
+    def __init__(self, total: int, report_every: int = 25):
+        self.total = total
+        self.report_every = report_every
+        self.done = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+
+    def tick(self, ok: bool):
+        self.done += 1
+        if not ok:
+            self.failed += 1
+        if self.done % self.report_every == 0 or self.done == self.total:
+            elapsed = time.monotonic() - self.started_at
+            logger.info(f"Harvest progress: {self.done}/{self.total} "
+                        f"({self.failed} failed, {self.done / elapsed:.1f} urls/s)")
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "total": self.total,
+            "scraped": self.done - self.failed,
+            "failed": self.failed,
+            "seconds": round(time.monotonic() - self.started_at, 1)
+        }
+
+
+async def run_harvester(urls: Iterable[str],
+                        workers: Optional[int] = None,
+                        per_domain: Optional[int] = None,
+                        sink: Optional[IngestionSink] = None) -> Dict[str, float]:
+    """
+    Concurrent detail harvest: N workers share the browser context pool,
+    each domain gets at most per_domain scrapes in flight, results stream into sink.
+    """
     logger.info("Starting Agent A: Data Harvester")
     
-    engine = PlaywrightEngine(headless=settings.HEADLESS)
+    urls = list(dict.fromkeys(urls)) # dedupe, keep order
+    workers = workers or settings.HARVEST_WORKERS
+    per_domain = per_domain or settings.HARVEST_PER_DOMAIN
+    sink = sink or IngestionSink()
+    
+    engine = PlaywrightEngine(headless=settings.HEADLESS, pool_size=workers)
     await engine.start()
     
+    queue: asyncio.Queue = asyncio.Queue()
+    for url in urls:
+        queue.put_nowait(url)
+    domain_limits = defaultdict(lambda: asyncio.Semaphore(per_domain))
+    progress = HarvestProgress(len(urls))
+    
+    async def worker():
+        while True:
+            try:
+                url = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            
+            data = None
+            try:
+                async with domain_limits[urlsplit(url).hostname]:
+                    data = await engine.scrape_detail(url)
+                if data:
+                    await sink.add(data)
+                    logger.success(f"Successfully scraped: {data.title}")
+            except Exception as e:
+                logger.error(f"Harvest worker failed on {url}: {e}")
+            finally:
+                progress.tick(ok=data is not None)
+    
     try:
-        results = []
-        for url in urls:
-            data = await engine.scrape_detail(url)
-            if data:
-                results.append(data)
-                logger.success(f"Successfully scraped: {data.title}")
-                # TODO: Save to MongoDB
-                
-        logger.info(f"Harvesting finished. Collected {len(results)} items.")
-        return results
+        await asyncio.gather(*(worker() for _ in range(min(workers, len(urls)) or 1)))
+        await sink.close()
+        
+        summary = {**progress.summary(), **sink.summary()}
+        logger.info(f"Harvesting finished. {summary}")
+        return summary
         
     finally:
         await engine.stop()
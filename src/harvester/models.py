@@ -25,8 +25,16 @@ class RawPropertyAd(BaseModel):
     layout: Optional[str] = None # e.g. "3+kk"
     
     # Extra metadata (images, energetic class, etc)
-    images: list[str] = []
-    attributes: Dict[str, Any] = {} # Flexible dict for other params
+    images: list[str] = Field(default_factory=list) # factory: avoids a deepcopy per instance
+    attributes: Dict[str, Any] = Field(default_factory=dict) # Flexible dict for other params
 
     class Config:
         arbitrary_types_allowed = True
+
+
+class ListingDetailBatch(BaseModel):
+    """
+    Result of a bulk description fetch. Partial failures don't fail the batch.
+    """
+    details: Dict[int, str] = Field(default_factory=dict) # hash_id -> description text
+    errors: Dict[int, str] = Field(default_factory=dict)  # hash_id -> error message
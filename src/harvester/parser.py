@@ -0,0 +1,112 @@
+import re
+from typing import List, Optional
+
+from src.harvester.models import RawPropertyAd
+
+# category_main_cb -> URL slug
+# 1=byt, 2=dum, 3=pozemek, 4=rekreace, 5=komercni
+CATEGORY_SLUGS = {
+    1: "byt",
+    2: "dum",
+    3: "pozemek",
+    4: "rekreace",
+    5: "komercni"
+}
+
+# Apartment category_sub_cb (layout ID) -> URL slug
+LAYOUT_SLUGS = {
+    2: "1+kk", 3: "1+1",
+    4: "2+kk", 5: "2+1",
+    6: "3+kk", 7: "3+1",
+    8: "4+kk", 9: "4+1",
+}
+
+# Non-apartment categories: one sub slug that Sreality accepts (Verified)
+CATEGORY_SUB_SLUGS = {
+    2: "rodinny",   # Houses
+    3: "bydleni",   # Land (stavebni is 404)
+    4: "chata",     # Recreation
+    5: "kancelare", # Commercial - best guess, or 'obchodni'
+}
+
+# URL slug -> category_main_cb
+CATEGORY_IDS = {slug: category for category, slug in CATEGORY_SLUGS.items()}
+
+# Item fields parse_item reads - everything else in the payload can be dropped early
+ESTATE_FIELDS = ("name", "locality", "price", "hash_id", "seo")
+
+DETAIL_URL = "https://www.sreality.cz/detail/prodej/{}/{}/{}/{}"
+
+# Match: 50 m², 50m2, 50 m2
+AREA_RE = re.compile(r'(\d+)\s*(?:m²|m2)', re.IGNORECASE)
+LAYOUT_RE = re.compile(r'(\d+\+kk|\d+\+1|\d+\+0|1\+1|garsoniera)', re.IGNORECASE)
+# Detail URLs end with the listing ID: .../praha-vinohrady/2151920204
+HASH_ID_RE = re.compile(r'/(\d+)/?(?:[?#].*)?$')
+# .../detail/prodej/byt/2+kk/...
+CATEGORY_RE = re.compile(r'/detail/[^/]+/([^/]+)/')
+
+
+def hash_id_from_url(url: str) -> Optional[int]:
+    """
+    Extracts the portal listing ID from a detail URL (None if absent).
+    """
+    match = HASH_ID_RE.search(url or "")
+    return int(match.group(1)) if match else None
+
+
+def category_from_url(url: str) -> Optional[int]:
+    """
+    category_main_cb from a detail URL slug (None if unknown).
+    """
+    match = CATEGORY_RE.search(url or "")
+    return CATEGORY_IDS.get(match.group(1)) if match else None
+
+
+class EstateParser:
+    """
+    Turns items of the /cs/v2/estates payload into RawPropertyAd objects.
+    Hot loop of deep scans - keep per-item work to lookups and precompiled regexes.
+    """
+
+    def parse_item(self, item: dict) -> RawPropertyAd:
+        title = item.get("name", "Unknown")
+        hash_id = item.get("hash_id")
+        seo = item.get("seo") or {}
+        
+        # Link Construction
+        # Sreality Redirects if 'seo_loc' is present and ID is correct.
+        cat_main = seo.get("category_main_cb", 1)
+        if cat_main == 1:
+            # Apartments: specific layout slug, /byt/vse/ if unknown
+            sub_slug = LAYOUT_SLUGS.get(seo.get("category_sub_cb", 1), "vse")
+        else:
+            sub_slug = CATEGORY_SUB_SLUGS.get(cat_main, "ostatni") # Universal Default
+        
+        link = DETAIL_URL.format(
+            CATEGORY_SLUGS.get(cat_main, "byt"),
+            sub_slug,
+            seo.get("locality") or "unknown",
+            hash_id
+        )
+        
+        # Area & Layout Parsing
+        area_match = AREA_RE.search(title)
+        layout_match = LAYOUT_RE.search(title)
+        
+        return RawPropertyAd(
+            hash_id=hash_id,
+            source_url=link,
+            source_portal="sreality",
+            title=title,
+            price_raw=str(item.get("price", 0)),
+            location_raw=item.get("locality", "Unknown"),
+            floor_area_raw=area_match.group(1) if area_match else "0",
+            layout=layout_match.group(1) if layout_match else title
+        )
+
+    def parse_page(self, items: List[dict]) -> List[RawPropertyAd]:
+        """
+        Batch entry point: parses a whole estates page.
+        """
+        parse_item = self.parse_item
+        return [parse_item(item) for item in items]
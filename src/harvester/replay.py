@@ -0,0 +1,146 @@
+import asyncio
+import base64
+import gzip
+import json
+import os
+import random
+from typing import Dict, Optional
+
+import httpx
+from loguru import logger
+
+from src.harvester.cache import ResponseCache
+
+# Response headers worth keeping (caching validators, content type, throttling)
+KEPT_HEADERS = ("content-type", "etag", "last-modified", "retry-after", "cache-control")
+
+
+def request_key(request: httpx.Request) -> str:
+    """
+    Method + URL with sorted params and no cache-buster, so recordings
+    match replays made at a different time.
+    """
+    base_url = str(request.url.copy_with(query=None))
+    return f"{request.method} {ResponseCache.make_key(base_url, dict(request.url.params))}"
+
+
+def load_archive(path: str) -> Dict[str, dict]:
+    """
+    Reads a .jsonl.gz archive (one record per line, multi-member gzip is fine).
+    Later records for the same request win.
+    """
+    records = {}
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                records[record["key"]] = record
+    return records
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Passes requests to the real network and appends every response to a
+    compressed archive (written through, so a crash keeps what was captured).
+    """
+
+    def __init__(self, archive_path: str, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.archive_path = archive_path
+        self.inner = inner or httpx.AsyncHTTPTransport()
+        self.recorded = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+        
+        record = {
+            "key": request_key(request),
+            "status": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() in KEPT_HEADERS},
+            "body": base64.b64encode(body).decode("ascii")
+        }
+        # Each append is its own gzip member - gzip.open reads them back as one stream
+        with gzip.open(self.archive_path, "at", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        self.recorded += 1
+        
+        # aread() already decoded the body: don't let the client decompress it again
+        headers = [(k, v) for k, v in response.headers.multi_items()
+                   if k.lower() not in ("content-encoding", "content-length")]
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=headers,
+            content=body,
+            request=request
+        )
+
+    async def aclose(self):
+        await self.inner.aclose()
+        logger.info(f"Recorded {self.recorded} responses to {self.archive_path}")
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Serves recorded responses offline, with optional latency and error injection
+    for deterministic throughput / concurrency / resilience tests.
+    """
+
+    def __init__(self,
+                 archive_path: str,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 error_rate: float = 0.0,
+                 error_status: int = 503,
+                 seed: Optional[int] = None):
+        self.records = load_archive(archive_path)
+        self.latency = latency # seconds per request
+        self.jitter = jitter   # +/- uniform seconds
+        self.error_rate = error_rate
+        self.error_status = error_status # 0 = raise httpx.ConnectError instead
+        self.random = random.Random(seed)
+        self.served = 0
+        self.missing = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        delay = self.latency + (self.random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        
+        if self.error_rate and self.random.random() < self.error_rate:
+            if not self.error_status:
+                raise httpx.ConnectError("Injected connection error", request=request)
+            return httpx.Response(self.error_status, request=request)
+        
+        record = self.records.get(request_key(request))
+        if record is None:
+            self.missing += 1
+            logger.warning(f"Replay miss: {request_key(request)}")
+            return httpx.Response(404, json={}, request=request)
+        
+        self.served += 1
+        return httpx.Response(
+            status_code=record["status"],
+            headers=record["headers"],
+            content=base64.b64decode(record["body"]),
+            request=request
+        )
+
+
+def transport_from_settings(settings, inner: Optional[httpx.AsyncBaseTransport] = None) -> Optional[httpx.AsyncBaseTransport]:
+    """
+    SREALITY_REPLAY_PATH wins over SREALITY_RECORD_PATH; None = real network.
+    inner: the pooled network transport that record mode wraps.
+    """
+    if settings.SREALITY_REPLAY_PATH:
+        if not os.path.exists(settings.SREALITY_REPLAY_PATH):
+            raise FileNotFoundError(f"Replay archive not found: {settings.SREALITY_REPLAY_PATH}")
+        logger.info(f"Sreality replay mode: {settings.SREALITY_REPLAY_PATH}")
+        return ReplayTransport(
+            settings.SREALITY_REPLAY_PATH,
+            latency=settings.SREALITY_REPLAY_LATENCY,
+            error_rate=settings.SREALITY_REPLAY_ERROR_RATE
+        )
+    if settings.SREALITY_RECORD_PATH:
+        logger.info(f"Sreality record mode: {settings.SREALITY_RECORD_PATH}")
+        return RecordingTransport(settings.SREALITY_RECORD_PATH, inner=inner)
+    return None
@@ -0,0 +1,249 @@
+import asyncio
+import inspect
+import json
+import os
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+from loguru import logger
+from pydantic import BaseModel
+
+from src.common.locations import REGION_IDS
+from src.harvester.api_engine import SrealityApiEngine
+from src.harvester.models import RawPropertyAd
+
+# Default price bands (CZK). None = open ended.
+DEFAULT_PRICE_BANDS = [0, 2_000_000, 4_000_000, 6_000_000, 8_000_000, 12_000_000, None]
+
+PageSink = Callable[[List[RawPropertyAd]], Union[None, Awaitable[None]]]
+
+
+class CrawlShard(BaseModel):
+    """
+    One unit of a nationwide crawl: locality x category x price band.
+    """
+    region_id: int
+    region_type: str = "region" # 'region' or 'district'
+    category_main: int = 1
+    min_price: int = 0
+    max_price: Optional[int] = None
+    
+    status: str = "pending" # pending, running, done, split, failed
+    result_size: Optional[int] = None
+    fetched: int = 0
+
+    @property
+    def shard_id(self) -> str:
+        return f"{self.region_type}:{self.region_id}|cat:{self.category_main}|{self.min_price}-{self.max_price or ''}"
+
+    def search_kwargs(self) -> dict:
+        return {
+            "region_id": self.region_id,
+            "region_type": self.region_type,
+            "category_main": self.category_main,
+            "min_price": self.min_price,
+            "max_price": self.max_price
+        }
+
+    def split(self) -> List["CrawlShard"]:
+        """
+        Halves the price band (open-ended bands are split at 2x the lower bound).
+        """
+        if self.max_price is None:
+            mid = max(self.min_price * 2, self.min_price + 5_000_000)
+        else:
+            mid = (self.min_price + self.max_price) // 2
+        base = self.model_dump(include={"region_id", "region_type", "category_main"})
+        return [
+            CrawlShard(**base, min_price=self.min_price, max_price=mid),
+            CrawlShard(**base, min_price=mid, max_price=self.max_price)
+        ]
+
+
+class CrawlScheduler:
+    """
+    Splits a whole-country scan into shards, runs them concurrently from a work
+    queue and persists shard progress so an interrupted crawl resumes.
+    """
+    # Sreality stops paginating deep result sets; shards above this are re-split
+    MAX_DEPTH = 6000
+    MIN_BAND_WIDTH = 100_000 # Don't split bands narrower than this
+    UNFINISHED = ("pending", "running", "failed")
+
+    def __init__(self,
+                 engine: SrealityApiEngine,
+                 state_path: str = "crawl_state.json",
+                 workers: int = 4,
+                 sink: Optional[PageSink] = None,
+                 max_depth: Optional[int] = None):
+        self.engine = engine
+        self.state_path = state_path
+        self.workers = workers
+        self.sink = sink
+        self.max_depth = max_depth or self.MAX_DEPTH
+        self.shards: Dict[str, CrawlShard] = {}
+        self.plan_ids: List[str] = [] # Root shards of the crawl (identifies the state file's plan)
+
+    @staticmethod
+    def plan(region_ids: Optional[List[int]] = None,
+             categories: Optional[List[int]] = None,
+             price_bands: Optional[List[Optional[int]]] = None) -> List[CrawlShard]:
+        """
+        Cartesian product of regions x categories x price bands.
+        """
+        region_ids = region_ids or list(REGION_IDS.values())
+        categories = categories or [1]
+        bands = price_bands or DEFAULT_PRICE_BANDS
+        return [
+            CrawlShard(region_id=r, category_main=c, min_price=lo, max_price=hi)
+            for r in region_ids
+            for c in categories
+            for lo, hi in zip(bands[:-1], bands[1:])
+        ]
+
+    def load_state(self, plan_ids: Optional[List[str]] = None) -> bool:
+        """
+        Loads an unfinished crawl. False if there is none, or it was planned
+        from different shards than `plan_ids`.
+        """
+        if not os.path.exists(self.state_path):
+            return False
+        with open(self.state_path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        if plan_ids is not None and raw.get("plan") != plan_ids:
+            logger.info(f"Crawl state {self.state_path} belongs to another plan, starting fresh")
+            return False
+        shards = {s.shard_id: s for s in (CrawlShard(**d) for d in raw.get("shards", []))}
+        if not any(s.status in self.UNFINISHED for s in shards.values()):
+            return False
+        self.plan_ids = raw.get("plan", [])
+        self.shards = shards
+        return True
+
+    def save_state(self):
+        # Write-then-rename so a crash never leaves a truncated state file
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"plan": self.plan_ids, "shards": [s.model_dump() for s in self.shards.values()]}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def clear_state(self):
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+    def progress(self) -> dict:
+        counts: Dict[str, int] = {}
+        for shard in self.shards.values():
+            counts[shard.status] = counts.get(shard.status, 0) + 1
+        counts["fetched"] = sum(s.fetched for s in self.shards.values())
+        return counts
+
+    async def run(self, shards: Optional[List[CrawlShard]] = None, resume: bool = True) -> dict:
+        """
+        Runs (or resumes) the crawl and returns the progress summary.
+        Only an unfinished crawl of the same plan is resumed; the state file
+        is removed once every shard is done.
+        """
+        planned = shards or self.plan()
+        plan_ids = [s.shard_id for s in planned]
+        if resume and self.load_state(plan_ids):
+            logger.info(f"Crawl: resuming {self.state_path}")
+        else:
+            self.plan_ids = plan_ids
+            self.shards = {s.shard_id: s for s in planned}
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        for shard in self.shards.values():
+            if shard.status in self.UNFINISHED:
+                shard.status = "pending"
+                shard.fetched = 0
+                queue.put_nowait(shard)
+        self.save_state()
+        logger.info(f"Crawl: {queue.qsize()} shards queued ({len(self.shards)} total)")
+        
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.workers)]
+        try:
+            await queue.join()
+        finally:
+            for w in workers:
+                w.cancel()
+            self.save_state()
+        
+        summary = self.progress()
+        if summary.get("failed"):
+            logger.warning(f"Crawl finished with failed shards, re-run to retry them: {summary}")
+        else:
+            # Nothing left to resume: the next run starts a fresh crawl
+            self.clear_state()
+            logger.info(f"Crawl finished: {summary}")
+        return summary
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            shard = await queue.get()
+            try:
+                await self._run_shard(shard, queue)
+            except Exception as e:
+                shard.status = "failed"
+                logger.error(f"Shard {shard.shard_id} failed: {e}")
+            finally:
+                self.save_state()
+                queue.task_done()
+
+    async def _run_shard(self, shard: CrawlShard, queue: asyncio.Queue):
+        shard.status = "running"
+        shard.result_size = await self.engine.count_results(**shard.search_kwargs())
+        
+        # Too deep for the upstream paginator -> re-split into narrower bands
+        too_deep = shard.result_size and shard.result_size > self.max_depth
+        narrow = shard.max_price is not None and shard.max_price - shard.min_price < self.MIN_BAND_WIDTH
+        if too_deep and not narrow:
+            shard.status = "split"
+            for child in shard.split():
+                if child.shard_id not in self.shards:
+                    self.shards[child.shard_id] = child
+                    queue.put_nowait(child)
+            logger.info(f"Shard {shard.shard_id} ({shard.result_size} results) re-split")
+            return
+        
+        if shard.result_size == 0:
+            shard.status = "done"
+            return
+        
+        limit = min(shard.result_size, self.max_depth) if shard.result_size else self.max_depth
+        async for page_ads in self.engine.iter_pages(limit=limit, **shard.search_kwargs()):
+            shard.fetched += len(page_ads)
+            if self.sink:
+                outcome = self.sink(page_ads)
+                if inspect.isawaitable(outcome):
+                    await outcome
+        
+        # Pages lost to upstream errors: retry the shard on the next run
+        if shard.result_size and shard.fetched < limit:
+            shard.status = "failed"
+            logger.warning(f"Shard {shard.shard_id} incomplete: {shard.fetched}/{limit}")
+            return
+        
+        shard.status = "done"
+        logger.info(f"Shard {shard.shard_id} done: {shard.fetched}/{shard.result_size} | {self.progress()}")
+
+
+if __name__ == "__main__":
+    # Nationwide apartments refresh into the DB. Re-run to resume after interruption.
+    from src.database import models  # noqa: F401 - registers the tables on Base.metadata
+    from src.database.session import Base, engine as db_engine
+    from src.harvester.ingest_queue import write_batch
+    
+    async def sink(page_ads: List[RawPropertyAd]):
+        # Sync SQLAlchemy (COPY loader on Postgres) - keep it off the event loop
+        await asyncio.to_thread(write_batch, page_ads)
+    
+    async def main():
+        Base.metadata.create_all(bind=db_engine)
+        api = SrealityApiEngine()
+        try:
+            scheduler = CrawlScheduler(api, sink=sink)
+            await scheduler.run()
+        finally:
+            await api.close()
+    
+    asyncio.run(main())
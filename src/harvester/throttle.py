@@ -0,0 +1,233 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from loguru import logger
+
+from src.common.config import settings
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised when a host's circuit breaker is open and calls are short-circuited.
+    """
+
+
+class TokenBucket:
+    """
+    Async token bucket with AIMD rate adaptation:
+    the rate halves on throttling signals (429) and creeps back up on success.
+    """
+
+    def __init__(self, rate: float, capacity: float, min_rate: float = 0.5):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        # Created per event loop: the process-wide limiter outlives asyncio.run() calls
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def _loop_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def acquire(self):
+        async with self._loop_lock():
+            self._refill()
+            if self.tokens < 1:
+                # Holding the lock while sleeping keeps waiters FIFO
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def penalize(self):
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = min(self.tokens, 0)
+
+    def reward(self):
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class CircuitBreaker:
+    """
+    Opens after N consecutive failures, lets one probe through after reset_timeout.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        # Half-open: start time of the single probe in flight
+        self.probe_started_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def check(self, host: str):
+        state = self.state
+        if state == "open":
+            raise CircuitOpenError(f"Circuit open for {host}, retry in {self.reset_timeout}s")
+        if state == "half-open":
+            now = time.monotonic()
+            # A probe that never reported back (e.g. cancelled) expires after reset_timeout
+            if self.probe_started_at is not None and now - self.probe_started_at < self.reset_timeout:
+                raise CircuitOpenError(f"Circuit half-open for {host}, probe in flight")
+            self.probe_started_at = now
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half-open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.probe_started_at = None
+
+
+class UpstreamLimiter:
+    """
+    Process-wide guard for upstream calls: per-host token buckets, retries with
+    jittered exponential backoff (honouring Retry-After) and a circuit breaker per host.
+    """
+
+    def __init__(self,
+                 default_budget: Tuple[float, float] = (8.0, 16.0),
+                 host_budgets: Optional[Dict[str, Tuple[float, float]]] = None,
+                 max_retries: int = 3,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 10.0,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = 30.0):
+        self.default_budget = default_budget # (requests/sec, burst)
+        self.host_budgets = host_budgets or {}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def bucket(self, host: str) -> TokenBucket:
+        if host not in self._buckets:
+            rate, burst = self.host_budgets.get(host, self.default_budget)
+            self._buckets[host] = TokenBucket(rate, burst)
+        return self._buckets[host]
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        if host not in self._breakers:
+            self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return self._breakers[host]
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        # "Full jitter" exponential backoff
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    async def get(self, client: httpx.AsyncClient, url: str, **kwargs) -> httpx.Response:
+        """
+        Rate-limited GET with retries. Returns the final response
+        (which may still be an error status) or raises the last transport error.
+        The breaker counts one failure per request, once its retries are exhausted;
+        429s only slow the bucket down.
+        """
+        host = urlsplit(url).hostname or ""
+        bucket = self.bucket(host)
+        breaker = self.breaker(host)
+        breaker.check(host)
+        
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            
+            retry_after = None
+            try:
+                resp = await client.get(url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    breaker.record_failure()
+                    raise
+                logger.warning(f"Upstream transport error ({e!r}), retry {attempt + 1}/{self.max_retries}")
+            else:
+                if resp.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    bucket.reward()
+                    return resp
+                
+                if resp.status_code == 429:
+                    bucket.penalize()
+                retry_after = self.parse_retry_after(resp.headers.get("retry-after"))
+                if attempt >= self.max_retries:
+                    if resp.status_code != 429:
+                        breaker.record_failure()
+                    return resp
+                logger.warning(f"Upstream {resp.status_code} for {host}, retry {attempt + 1}/{self.max_retries}")
+            
+            await asyncio.sleep(self.backoff_delay(attempt, retry_after))
+            attempt += 1
+
+    def stats(self) -> dict:
+        return {
+            host: {
+                "rate": round(self._buckets[host].rate, 2),
+                "circuit": self.breaker(host).state
+            }
+            for host in self._buckets
+        }
+
+
+# Process-wide limiter shared by every engine instance
+_default_limiter: Optional[UpstreamLimiter] = None
+
+
+def get_default_limiter() -> UpstreamLimiter:
+    global _default_limiter
+    if _default_limiter is None:
+        _default_limiter = UpstreamLimiter(
+            default_budget=(settings.SREALITY_RATE_PER_SEC, settings.SREALITY_RATE_BURST),
+            max_retries=settings.SREALITY_MAX_RETRIES,
+            backoff_base=settings.SREALITY_BACKOFF_BASE,
+            failure_threshold=settings.SREALITY_BREAKER_THRESHOLD,
+            reset_timeout=settings.SREALITY_BREAKER_RESET
+        )
+    return _default_limiter
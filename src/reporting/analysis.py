@@ -1,5 +1,6 @@
+from typing import List, Optional, Sequence
 from pydantic import BaseModel
-from src.cleaner.models import CleanPropertyAd
+from src.cleaner.models import CleanPropertyAd, PropertyType
 
 class FinancialMetrics(BaseModel):
     gross_yield_percent: float = 0.0
@@ -8,12 +9,23 @@ class FinancialMetrics(BaseModel):
     market_sale_per_m2: float = 0.0  # From Market Data
     undervaluation_percent: float = 0.0 # Positive = Good deal
     is_good_deal: bool = False
+    market_sample_size: int = 0 # Live listings behind market_sale_per_m2 (0 = static market data)
+    market_trend_percent: Optional[float] = None # Median price/m2 change since the last snapshot
 
 
 
 import json
 import os
+from src.common.config import settings
 from src.cleaner.models import CleanPropertyAd
+from src.cleaner.frame import ListingFrame
+from src.reporting.locality import LocalityResolver
+
+# NumPy (requirements.txt); without it evaluate_batch falls back to a plain Python loop
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # Load Market Map Global
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -26,35 +38,50 @@ try:
 except Exception as e:
     print(f"Stats Load Error: {e}")
 
+# Built once: token index over folded city / region names
+LOCALITY_RESOLVER = LocalityResolver(MARKET_MAP)
+
+# PropertyType -> Sreality category_main_cb (market_stats groups)
+CATEGORY_BY_TYPE = {
+    PropertyType.APARTMENT: 1,
+    PropertyType.HOUSE: 2,
+    PropertyType.LAND: 3,
+}
+
 class FinancialAnalyst:
-    def __init__(self, min_yield_target: float = 4.0):
+    def __init__(self, min_yield_target: float = 4.0, market_stats=None):
         self.min_yield_target = min_yield_target
+        # Live sale benchmarks from ingested listings (falls back to MARKET_MAP)
+        if market_stats is None and settings.MARKET_STATS_ENABLED:
+            from src.reporting.market_stats import get_market_stats_cache
+            market_stats = get_market_stats_cache()
+        self.market_stats = market_stats
 
     def get_market_data(self, locality: str) -> dict:
-        default = MARKET_MAP.get("default", {"rent": 200, "sale": 60000})
-        
-        if not locality:
-            return default
-            
-        loc_lower = locality.lower()
-        
-        # 1. Check Cities
-        for city, data in MARKET_MAP.get("cities", {}).items():
-            if city in loc_lower:
-                return data
-                
-        # 2. Check Regions
-        for region, data in MARKET_MAP.get("regions", {}).items():
-            if region.lower() in loc_lower:
-                return data
+        # Indexed, memoized lookup (see src/reporting/locality.py)
+        return LOCALITY_RESOLVER.resolve(locality or "")
+
+    def market_benchmarks(self, locality: Optional[str], property_type: PropertyType, layout: Optional[str]) -> tuple:
+        """
+        (rent_per_m2, sale_per_m2, sample_size, trend_percent) for one listing.
+        Live asking-price medians win when enough comparable listings exist.
+        """
+        market_stats = self.get_market_data(locality or "")
+        market_rent_per_m2 = market_stats.get("rent", 200)
+        market_sale_per_m2 = market_stats.get("sale", 60000)
         
-        return default
+        benchmark = None
+        if self.market_stats:
+            benchmark = self.market_stats.lookup(locality, CATEGORY_BY_TYPE.get(property_type), layout)
+        if benchmark:
+            return market_rent_per_m2, benchmark.median_ppm2, benchmark.listing_count, benchmark.trend_percent
+        return market_rent_per_m2, market_sale_per_m2, 0, None
 
     def evaluate(self, ad: CleanPropertyAd) -> FinancialMetrics:
         # 1. Market Data Lookup
-        market_stats = self.get_market_data(ad.locality or "")
-        market_rent_per_m2 = market_stats.get("rent", 200)
-        market_sale_per_m2 = market_stats.get("sale", 60000)
+        market_rent_per_m2, market_sale_per_m2, sample_size, trend = self.market_benchmarks(
+            ad.locality, ad.property_type, ad.layout_normalized
+        )
         
         monthly_rent = ad.floor_area_m2 * market_rent_per_m2 if ad.floor_area_m2 else 0
         annual_rent = monthly_rent * 12
@@ -85,7 +112,174 @@ class FinancialAnalyst:
             monthly_rent_per_m2=market_rent_per_m2, 
             market_sale_per_m2=market_sale_per_m2,
             undervaluation_percent=round(undervaluation, 1),
-            is_good_deal=is_good
+            is_good_deal=is_good,
+            market_sample_size=sample_size,
+            market_trend_percent=trend
         )
 
+    def market_columns(self, ads: Sequence[CleanPropertyAd]) -> dict:
+        """
+        Per-ad market inputs for evaluate_batch (lookups are memoized / O(1)).
+        """
+        columns = {"rent_per_m2": [], "sale_per_m2": [], "sample_size": [], "trend_percent": []}
+        for ad in ads:
+            rent, sale, sample_size, trend = self.market_benchmarks(ad.locality, ad.property_type, ad.layout_normalized)
+            columns["rent_per_m2"].append(rent)
+            columns["sale_per_m2"].append(sale)
+            columns["sample_size"].append(sample_size)
+            columns["trend_percent"].append(trend)
+        return columns
+
+    def evaluate_ads(self, ads: Sequence[CleanPropertyAd]) -> "FinancialMetricsBatch":
+        """
+        Batch counterpart of evaluate() for a list of ads.
+        """
+        market = self.market_columns(ads)
+        return self.evaluate_batch(
+            price=[ad.price_czk for ad in ads],
+            area=[ad.floor_area_m2 for ad in ads],
+            price_per_m2=[ad.price_per_m2 for ad in ads],
+            rent_per_m2=market["rent_per_m2"],
+            sale_per_m2=market["sale_per_m2"],
+            sample_size=market["sample_size"],
+            trend_percent=market["trend_percent"]
+        )
+
+    def evaluate_frame(self, frame: ListingFrame) -> "FinancialMetricsBatch":
+        """
+        Scores a ListingFrame. Locality / layout are interned, so market
+        lookups run once per distinct combination instead of once per row.
+        """
+        lookups = {}
+        rent, sale, sample_size, trend = [], [], [], []
+        for key in zip(frame.locality, frame.property_type, frame.layout):
+            found = lookups.get(key)
+            if found is None:
+                found = lookups[key] = self.market_benchmarks(*key)
+            rent.append(found[0])
+            sale.append(found[1])
+            sample_size.append(found[2])
+            trend.append(found[3])
+        
+        return self.evaluate_batch(
+            price=frame.price_czk,
+            area=frame.floor_area_m2,
+            price_per_m2=frame.price_per_m2,
+            rent_per_m2=rent,
+            sale_per_m2=sale,
+            sample_size=sample_size,
+            trend_percent=trend
+        )
+
+    def evaluate_batch(self,
+                       price: Sequence[Optional[float]],
+                       area: Sequence[Optional[float]],
+                       price_per_m2: Sequence[Optional[float]],
+                       rent_per_m2: Sequence[float],
+                       sale_per_m2: Sequence[float],
+                       sample_size: Optional[Sequence[int]] = None,
+                       trend_percent: Optional[Sequence[Optional[float]]] = None) -> "FinancialMetricsBatch":
+        """
+        Same rules as evaluate(), one pass over columns (None = missing).
+        Vectorized with NumPy when installed (np.round may differ from round()
+        by one in the last decimal on exact .5 ties).
+        """
+        size = len(price)
+        sample_size = sample_size if sample_size is not None else [0] * size
+        trend_percent = trend_percent if trend_percent is not None else [None] * size
+        
+        if np is None:
+            return self._evaluate_batch_python(price, area, price_per_m2, rent_per_m2, sale_per_m2,
+                                               sample_size, trend_percent)
+        
+        price = np.asarray(price, dtype=float) # None -> NaN
+        area = np.asarray(area, dtype=float)
+        price_per_m2 = np.asarray(price_per_m2, dtype=float)
+        rent = np.asarray(rent_per_m2, dtype=float)
+        sale = np.asarray(sale_per_m2, dtype=float)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # 1. Rent (NaN / 0 area -> no rent)
+            monthly_rent = np.where(np.nan_to_num(area) != 0, area * rent, 0.0)
+            annual_rent = monthly_rent * 12
+            # 2. Yield (same > 100k sanity check)
+            gross_yield = np.where(price > 100000, annual_rent / price * 100, 0.0)
+            # 3. Undervaluation vs. market sale price/m2
+            has_market = (price_per_m2 > 1000) & (np.nan_to_num(sale) != 0)
+            undervaluation = np.where(has_market, (sale - price_per_m2) / sale * 100, 0.0)
+        
+        return FinancialMetricsBatch(
+            gross_yield_percent=np.round(gross_yield, 2),
+            estimated_annual_rent_czk=np.round(annual_rent, 0),
+            monthly_rent_per_m2=rent,
+            market_sale_per_m2=sale,
+            undervaluation_percent=np.round(undervaluation, 1),
+            is_good_deal=gross_yield >= self.min_yield_target,
+            market_sample_size=np.asarray(sample_size, dtype=np.int64),
+            market_trend_percent=list(trend_percent)
+        )
+
+    def _evaluate_batch_python(self, price, area, price_per_m2, rent_per_m2, sale_per_m2,
+                               sample_size, trend_percent) -> "FinancialMetricsBatch":
+        yields, rents, undervaluations, good = [], [], [], []
+        for p, a, ppm2, rent, sale in zip(price, area, price_per_m2, rent_per_m2, sale_per_m2):
+            annual_rent = a * rent * 12 if a else 0
+            gross_yield = (annual_rent / p) * 100 if p and p > 100000 else 0.0
+            undervaluation = (sale - ppm2) / sale * 100 if ppm2 and ppm2 > 1000 and sale else 0.0
+            yields.append(round(gross_yield, 2))
+            rents.append(round(annual_rent, 0))
+            undervaluations.append(round(undervaluation, 1))
+            good.append(gross_yield >= self.min_yield_target)
+        
+        return FinancialMetricsBatch(
+            gross_yield_percent=yields,
+            estimated_annual_rent_czk=rents,
+            monthly_rent_per_m2=list(rent_per_m2),
+            market_sale_per_m2=list(sale_per_m2),
+            undervaluation_percent=undervaluations,
+            is_good_deal=good,
+            market_sample_size=list(sample_size),
+            market_trend_percent=list(trend_percent)
+        )
+
+
+class FinancialMetricsBatch:
+    """
+    Columnar result of FinancialAnalyst.evaluate_batch: one array (or list)
+    per FinancialMetrics field. Row objects are only built when indexed.
+    """
+    
+    COLUMNS = tuple(FinancialMetrics.model_fields)
+    
+    def __init__(self, **columns):
+        self.columns = columns
+        self._size = len(columns["gross_yield_percent"])
+        self._rows: List[Optional[FinancialMetrics]] = [None] * self._size
+        self._plain = None # Python-scalar copies of the columns, built on first row access
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __getattr__(self, name: str):
+        columns = self.__dict__.get("columns", {})
+        if name in columns:
+            return columns[name]
+        raise AttributeError(name)
+    
+    def __getitem__(self, index: int) -> FinancialMetrics:
+        row = self._rows[index]
+        if row is None:
+            if self._plain is None:
+                self._plain = {
+                    name: (values.tolist() if hasattr(values, "tolist") else list(values))
+                    for name, values in self.columns.items()
+                }
+            row = FinancialMetrics(**{name: values[index] for name, values in self._plain.items()})
+            self._rows[index] = row
+        return row
+    
+    def __iter__(self):
+        for index in range(self._size):
+            yield self[index]
+
 
@@ -0,0 +1,68 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+
+def fold(text: str) -> str:
+    """
+    Lowercase, strip diacritics, punctuation -> spaces: "Plzeň-Bory" -> "plzen bory".
+    """
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    ascii_text = "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+    return NON_ALNUM_RE.sub(" ", ascii_text).strip()
+
+
+class LocalityResolver:
+    """
+    Precompiled matcher for MARKET_MAP names.
+    Token index (first token -> candidate names) over folded names, so a lookup
+    is one pass over the locality's tokens instead of a substring scan of every
+    city and region. Longest match wins ("praha 2" beats "praha"); on ties
+    cities beat regions. Results are memoized per locality string.
+    """
+
+    CITY, REGION = 2, 1 # Tie-break priority
+
+    def __init__(self, market_map: dict, memo_size: int = 8192):
+        self.default = market_map.get("default", {"rent": 200, "sale": 60000})
+        # first token -> [(tokens, priority, data)], longest first
+        self._index: Dict[str, List[Tuple[tuple, int, dict]]] = {}
+
+        for name, data in market_map.get("regions", {}).items():
+            self._add(name, self.REGION, data)
+        for name, data in market_map.get("cities", {}).items():
+            self._add(name, self.CITY, data)
+        for candidates in self._index.values():
+            candidates.sort(key=lambda entry: (len(entry[0]), entry[1]), reverse=True)
+
+        self.resolve = lru_cache(maxsize=memo_size)(self._resolve)
+
+    def _add(self, name: str, priority: int, data: dict):
+        tokens = tuple(fold(name).split())
+        if tokens:
+            self._index.setdefault(tokens[0], []).append((tokens, priority, data))
+
+    def match(self, locality: str) -> Optional[dict]:
+        """
+        Best matching entry, None if nothing in the map occurs in the locality.
+        """
+        tokens = fold(locality).split()
+        best_rank, best = None, None
+        for i, token in enumerate(tokens):
+            for name_tokens, priority, data in self._index.get(token, ()):
+                size = len(name_tokens)
+                if tuple(tokens[i:i + size]) != name_tokens:
+                    continue
+                rank = (size, priority)
+                if best_rank is None or rank > best_rank:
+                    best_rank, best = rank, data
+                break # Candidates are sorted: first hit is the longest here
+        return best
+
+    def _resolve(self, locality: str) -> dict:
+        if not locality:
+            return self.default
+        return self.match(locality) or self.default
@@ -0,0 +1,419 @@
+import asyncio
+import datetime
+import json
+import re
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+from pydantic import BaseModel
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from src.common.config import settings
+from src.common.locations import CITY_REGIONS
+from src.database.models import MarketStat, MarketStatsWatermark, Property
+from src.harvester.ingestion import IngestionService, PREFETCH_CHUNK
+from src.harvester.models import RawPropertyAd
+from src.harvester.parser import LAYOUT_RE, category_from_url
+
+LAYOUT_ANY = "*"
+EXPIRY_WATERMARK = "expiry"
+# Same sanity floor as FinancialAnalyst ('Price on Request' = 1 CZK)
+MIN_PRICE = 100000
+# "Praha 2" -> "praha"
+CITY_NUMBER_RE = re.compile(r'\s+\d+$')
+
+# Group: (level, area, category_main, layout)
+GroupKey = Tuple[str, str, int, str]
+
+
+@lru_cache(maxsize=8192)
+def area_keys(locality: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    Most specific first: "Vinohradská, Praha 2 - Vinohrady" ->
+    (("district", "praha 2"), ("city", "praha"), ("region", "praha"))
+    """
+    if not locality:
+        return ()
+    segment = locality.split(",")[-1].strip().lower()
+    city_part, _, quarter = segment.partition(" - ")
+    city_part = city_part.strip()
+    city = CITY_NUMBER_RE.sub("", city_part)
+    if not city:
+        return ()
+
+    keys = []
+    if city_part != city:
+        keys.append(("district", city_part)) # Numbered Prague districts
+    elif quarter:
+        keys.append(("district", f"{city} - {quarter.strip()}"))
+    keys.append(("city", city))
+    region = CITY_REGIONS.get(city)
+    if region:
+        keys.append(("region", region))
+    return tuple(keys)
+
+def normalize_layout(text: Optional[str]) -> Optional[str]:
+    match = LAYOUT_RE.search(text or "")
+    return match.group(1).lower() if match else None
+
+def group_keys(locality: str, category: Optional[int], layout: Optional[str]) -> List[GroupKey]:
+    if category is None:
+        return []
+    keys = []
+    for level, area in area_keys(locality or ""):
+        keys.append((level, area, category, LAYOUT_ANY))
+        if layout:
+            keys.append((level, area, category, layout))
+    return keys
+
+def group_key_str(key: GroupKey) -> str:
+    return "|".join(str(part) for part in key)
+
+def price_per_m2(price: Optional[float], area: Optional[float]) -> Optional[float]:
+    if not price or price <= MIN_PRICE or not area or area <= 0:
+        return None
+    return price / area
+
+def histogram_percentile(histogram: Dict[int, int], total: int, q: float, bucket_width: int) -> Optional[float]:
+    """
+    q-quantile of a bucketed distribution, linear inside the bucket.
+    """
+    if total <= 0:
+        return None
+    target = q * total
+    cumulative = 0
+    for index in sorted(histogram):
+        count = histogram[index]
+        if cumulative + count >= target:
+            fraction = (target - cumulative) / count if count else 0.0
+            return (index + fraction) * bucket_width
+        cumulative += count
+    return (max(histogram) + 1) * bucket_width
+
+
+class MarketStatsUpdater:
+    """
+    Keeps market_stats in sync with the active listing stock by delta:
+    every ingested batch moves listings between histogram buckets
+    (new -> +1, repriced -> -1/+1, not seen for window_days -> -1).
+    No full recomputation except the one-time bootstrap (rebuild).
+    """
+
+    def __init__(self,
+                 bucket_width: int = 1000,
+                 max_ppm2: int = 400000,
+                 window_days: int = 30,
+                 trend_days: int = 7):
+        self.bucket_width = bucket_width
+        self.max_bucket = max_ppm2 // bucket_width
+        self.window = datetime.timedelta(days=window_days)
+        self.trend_interval = datetime.timedelta(days=trend_days)
+
+    def bucket(self, ppm2: float) -> int:
+        return min(int(ppm2 // self.bucket_width), self.max_bucket)
+
+    def contribution(self, locality: str, source_url: str, layout: Optional[str],
+                     price: Optional[float], area: Optional[float]) -> Tuple[List[GroupKey], Optional[int]]:
+        ppm2 = price_per_m2(price, area)
+        if ppm2 is None:
+            return [], None
+        keys = group_keys(locality, category_from_url(source_url), normalize_layout(layout))
+        return keys, self.bucket(ppm2)
+
+    def apply(self, db: Session, ads: Iterable[RawPropertyAd]):
+        """
+        Call inside the ingestion transaction, BEFORE the batch is written
+        (previous prices are read from `properties`).
+        """
+        ads_by_id = {ad.hash_id: ad for ad in ads}
+        if not ads_by_id:
+            return
+        now = datetime.datetime.now()
+
+        # 1. One-time bootstrap from the existing table
+        watermark = db.get(MarketStatsWatermark, EXPIRY_WATERMARK)
+        if watermark is None:
+            watermark = self.rebuild(db, now)
+
+        # 2. Drop listings that went stale since the last batch
+        deltas: Dict[GroupKey, Dict[int, int]] = {}
+        self._expire(db, watermark, now, deltas)
+
+        # 3. Previous state of this batch (only counted if still inside the window)
+        previous = {}
+        hash_ids = list(ads_by_id)
+        for i in range(0, len(hash_ids), PREFETCH_CHUNK):
+            rows = db.execute(
+                select(Property.hash_id, Property.current_price, Property.floor_area, Property.last_seen_at)
+                .where(Property.hash_id.in_(hash_ids[i:i + PREFETCH_CHUNK]))
+            )
+            for hash_id, price, area, last_seen_at in rows:
+                if last_seen_at is not None and last_seen_at.replace(tzinfo=None) >= watermark.expired_through.replace(tzinfo=None):
+                    previous[hash_id] = (price, area)
+
+        # 4. Deltas: listing location/category/layout don't change, only the bucket does
+        for hash_id, ad in ads_by_id.items():
+            price_val, area_val = IngestionService.parse_numbers(ad)
+            keys, new_bucket = self.contribution(ad.location_raw, ad.source_url, ad.layout, price_val, area_val)
+            if not keys and hash_id not in previous:
+                continue
+            old_bucket = None
+            if hash_id in previous:
+                old_price, old_area = previous[hash_id]
+                old_ppm2 = price_per_m2(old_price, old_area)
+                old_bucket = self.bucket(old_ppm2) if old_ppm2 is not None else None
+            if old_bucket == new_bucket:
+                continue
+            if not keys:
+                # Now unpriced - still remove the old contribution
+                keys = group_keys(ad.location_raw, category_from_url(ad.source_url), normalize_layout(ad.layout))
+            for key in keys:
+                bucket_deltas = deltas.setdefault(key, {})
+                if old_bucket is not None:
+                    bucket_deltas[old_bucket] = bucket_deltas.get(old_bucket, 0) - 1
+                if new_bucket is not None:
+                    bucket_deltas[new_bucket] = bucket_deltas.get(new_bucket, 0) + 1
+
+        # 5. Read-modify-write of the touched groups only
+        self._merge(db, deltas, now)
+
+    def _stock_deltas(self, rows, deltas: Dict[GroupKey, Dict[int, int]], sign: int):
+        """
+        Adds `sign` per listing for (location_raw, raw_data, current_price, floor_area) rows.
+        """
+        for location_raw, raw_data, price, area in rows:
+            try:
+                raw = json.loads(raw_data) if raw_data else {}
+            except ValueError:
+                raw = {}
+            keys, bucket = self.contribution(location_raw, raw.get("source_url"), raw.get("layout"), price, area)
+            if bucket is None:
+                continue
+            for key in keys:
+                bucket_deltas = deltas.setdefault(key, {})
+                bucket_deltas[bucket] = bucket_deltas.get(bucket, 0) + sign
+
+    def _expire(self, db: Session, watermark: MarketStatsWatermark, now: datetime.datetime, deltas: dict):
+        cutoff = now - self.window
+        expired_through = watermark.expired_through.replace(tzinfo=None)
+        if cutoff <= expired_through:
+            return
+        # Range scan on the last_seen_at index
+        rows = db.execute(
+            select(Property.location_raw, Property.raw_data, Property.current_price, Property.floor_area)
+            .where(Property.last_seen_at >= expired_through, Property.last_seen_at < cutoff)
+        )
+        self._stock_deltas(rows, deltas, -1)
+        watermark.expired_through = cutoff
+
+    def rebuild(self, db: Session, now: Optional[datetime.datetime] = None) -> MarketStatsWatermark:
+        """
+        Full recomputation from `properties` (bootstrap / repair). Does not commit.
+        """
+        now = now or datetime.datetime.now()
+        cutoff = now - self.window
+        logger.info("Market stats: rebuilding from properties...")
+        db.execute(delete(MarketStat))
+
+        deltas: Dict[GroupKey, Dict[int, int]] = {}
+        rows = db.execute(
+            select(Property.location_raw, Property.raw_data, Property.current_price, Property.floor_area)
+            .where(Property.last_seen_at >= cutoff)
+            .execution_options(yield_per=2000)
+        )
+        self._stock_deltas(rows, deltas, +1)
+        self._merge(db, deltas, now)
+
+        watermark = db.get(MarketStatsWatermark, EXPIRY_WATERMARK)
+        if watermark is None:
+            watermark = MarketStatsWatermark(name=EXPIRY_WATERMARK, expired_through=cutoff)
+            db.add(watermark)
+        watermark.expired_through = cutoff
+        db.flush()
+        logger.info(f"Market stats: rebuilt {len(deltas)} groups.")
+        return watermark
+
+    def _merge(self, db: Session, deltas: Dict[GroupKey, Dict[int, int]], now: datetime.datetime):
+        deltas = {key: changes for key, changes in deltas.items() if any(changes.values())}
+        if not deltas:
+            return
+        by_str = {group_key_str(key): key for key in deltas}
+
+        existing = {}
+        keys = list(by_str)
+        for i in range(0, len(keys), PREFETCH_CHUNK):
+            rows = db.execute(
+                select(MarketStat).where(MarketStat.group_key.in_(keys[i:i + PREFETCH_CHUNK])).with_for_update()
+            ).scalars()
+            existing.update({row.group_key: row for row in rows})
+
+        for key_str, key in by_str.items():
+            stat = existing.get(key_str)
+            if stat is None:
+                level, area, category, layout = key
+                stat = MarketStat(group_key=key_str, level=level, area=area, category_main=category,
+                                  layout=layout, listing_count=0, histogram="{}", snapshot_at=now)
+                db.add(stat)
+
+            # Trend snapshot before applying this batch
+            snapshot_at = stat.snapshot_at.replace(tzinfo=None) if stat.snapshot_at else None
+            if snapshot_at is None or now - snapshot_at >= self.trend_interval:
+                stat.prev_median_ppm2 = stat.median_ppm2
+                stat.snapshot_at = now
+
+            histogram = {int(index): count for index, count in json.loads(stat.histogram or "{}").items()}
+            for index, change in deltas[key].items():
+                count = histogram.get(index, 0) + change
+                if count > 0:
+                    histogram[index] = count
+                else:
+                    histogram.pop(index, None)
+
+            total = sum(histogram.values())
+            stat.histogram = json.dumps(histogram)
+            stat.listing_count = total
+            stat.p25_ppm2 = self._round(histogram_percentile(histogram, total, 0.25, self.bucket_width))
+            stat.median_ppm2 = self._round(histogram_percentile(histogram, total, 0.5, self.bucket_width))
+            stat.p75_ppm2 = self._round(histogram_percentile(histogram, total, 0.75, self.bucket_width))
+            stat.updated_at = now
+        db.flush()
+
+    @staticmethod
+    def _round(value: Optional[float]) -> Optional[int]:
+        return int(round(value)) if value is not None else None
+
+
+class MarketBenchmark(BaseModel):
+    level: str
+    area: str
+    layout: str
+    listing_count: int
+    median_ppm2: int
+    p25_ppm2: Optional[int] = None
+    p75_ppm2: Optional[int] = None
+    trend_percent: Optional[float] = None
+
+
+class MarketStatsCache:
+    """
+    In-process snapshot of market_stats for scoring: a dict lookup per ad,
+    reloaded from the DB every `ttl` seconds. Inside the event loop await
+    refresh() first, so lookup() never queries the DB on the loop thread.
+    """
+
+    def __init__(self, ttl: float = 300, min_count: int = 5, session_factory=None):
+        self.ttl = ttl
+        self.min_count = min_count
+        self.session_factory = session_factory
+        self._stats: Dict[GroupKey, MarketBenchmark] = {}
+        self._loaded_at: Optional[float] = None
+
+    def lookup(self, locality: str, category: Optional[int], layout: Optional[str]) -> Optional[MarketBenchmark]:
+        """
+        Most specific group with enough listings: district -> city -> region,
+        exact layout before all layouts.
+        """
+        if category is None or not locality:
+            return None
+        self._ensure_loaded()
+        if not self._stats:
+            return None
+        layout = normalize_layout(layout)
+        for level, area in area_keys(locality):
+            if layout:
+                found = self._stats.get((level, area, category, layout))
+                if found:
+                    return found
+            found = self._stats.get((level, area, category, LAYOUT_ANY))
+            if found:
+                return found
+        return None
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    async def refresh(self):
+        """
+        Reloads a stale snapshot in a worker thread (event-loop safe).
+        """
+        if self._stale():
+            self._loaded_at = time.monotonic() # Concurrent requests don't reload twice
+            await asyncio.to_thread(self._load)
+
+    def _stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl
+
+    def _ensure_loaded(self):
+        if self._stale():
+            self._loaded_at = time.monotonic() # Also on failure: don't retry on every ad
+            self._load()
+
+    def _load(self):
+        if self.session_factory is None:
+            from src.database.session import SessionLocal
+            self.session_factory = SessionLocal
+
+        db = self.session_factory()
+        try:
+            rows = db.execute(
+                select(MarketStat).where(MarketStat.listing_count >= self.min_count)
+            ).scalars()
+            stats = {}
+            for row in rows:
+                trend = None
+                if row.prev_median_ppm2 and row.median_ppm2:
+                    trend = round((row.median_ppm2 - row.prev_median_ppm2) / row.prev_median_ppm2 * 100, 1)
+                stats[(row.level, row.area, row.category_main, row.layout)] = MarketBenchmark(
+                    level=row.level,
+                    area=row.area,
+                    layout=row.layout,
+                    listing_count=row.listing_count,
+                    median_ppm2=row.median_ppm2,
+                    p25_ppm2=row.p25_ppm2,
+                    p75_ppm2=row.p75_ppm2,
+                    trend_percent=trend
+                )
+            self._stats = stats
+            logger.info(f"Market stats cache loaded: {len(stats)} groups")
+        except Exception as e:
+            logger.warning(f"Market stats unavailable, using static market data: {e}")
+            self._stats = {}
+        finally:
+            db.close()
+
+
+# Process-wide instances
+_updater: Optional[MarketStatsUpdater] = None
+_cache: Optional[MarketStatsCache] = None
+
+def get_market_stats_updater() -> MarketStatsUpdater:
+    global _updater
+    if _updater is None:
+        _updater = MarketStatsUpdater(
+            bucket_width=settings.MARKET_STATS_BUCKET,
+            max_ppm2=settings.MARKET_STATS_MAX_PPM2,
+            window_days=settings.MARKET_STATS_WINDOW_DAYS,
+            trend_days=settings.MARKET_STATS_TREND_DAYS
+        )
+    return _updater
+
+def get_market_stats_cache() -> MarketStatsCache:
+    global _cache
+    if _cache is None:
+        _cache = MarketStatsCache(ttl=settings.MARKET_STATS_CACHE_TTL, min_count=settings.MARKET_STATS_MIN_COUNT)
+    return _cache
+
+
+if __name__ == "__main__":
+    # Manual rebuild: python -m src.reporting.market_stats
+    from src.database.session import SessionLocal, Base, engine as db_engine
+    Base.metadata.create_all(bind=db_engine)
+    db = SessionLocal()
+    try:
+        get_market_stats_updater().rebuild(db)
+        db.commit()
+    finally:
+        db.close()
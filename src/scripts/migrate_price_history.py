@@ -0,0 +1,204 @@
+import os
+import sys
+import argparse
+import datetime
+from sqlalchemy import create_engine, inspect, text
+# Fix path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from src.database.models import Base
+from src.database.session import resolve_database_url
+
+# Indexes from src/database/models.py, for databases created before they existed
+INDEXES = [
+    ("ix_price_history_property_detected", "price_history", "property_id, detected_at"),
+    ("ix_price_history_detected_at", "price_history", "detected_at"),
+    ("ix_properties_last_seen_at", "properties", "last_seen_at"),
+]
+# Superseded by the composite index (same leading column)
+OBSOLETE_INDEXES = ["ix_price_history_property_id"]
+
+
+def month_start(value: datetime.date) -> datetime.date:
+    return datetime.date(value.year, value.month, 1)
+
+def add_months(value: datetime.date, months: int) -> datetime.date:
+    month = value.month - 1 + months
+    return datetime.date(value.year + month // 12, month % 12 + 1, 1)
+
+def partition_name(month: datetime.date) -> str:
+    return f"price_history_{month:%Y_%m}"
+
+
+def apply_indexes(engine):
+    """
+    Idempotent: CREATE INDEX IF NOT EXISTS works on SQLite and Postgres.
+    """
+    with engine.begin() as conn:
+        for name, table, columns in INDEXES:
+            print(f"🔹 Index {name} ON {table} ({columns})")
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+        for name in OBSOLETE_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+def is_partitioned(conn) -> bool:
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = 'price_history'"
+    )).scalar())
+
+def table_exists(conn, name: str) -> bool:
+    return conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+
+def ensure_partitions(engine, months_ahead: int = 3, start: datetime.date = None):
+    """
+    Creates missing monthly partitions up to `months_ahead` from now.
+    Run periodically (e.g. monthly cron); rows outside them land in price_history_default
+    and are moved into the new partition once it is created.
+    """
+    first = month_start(start or datetime.date.today())
+    last = add_months(month_start(datetime.date.today()), months_ahead)
+    with engine.begin() as conn:
+        # 1. Months without a partition yet
+        missing = []
+        month = first
+        while month <= last:
+            if not table_exists(conn, partition_name(month)):
+                missing.append(month)
+            month = add_months(month, 1)
+        if not missing:
+            return
+
+        # 2. Postgres refuses to create a partition while the DEFAULT partition holds
+        #    rows in its range: detach the default, create, move the rows, re-attach.
+        lo, hi = missing[0].isoformat(), add_months(missing[-1], 1).isoformat()
+        detached = table_exists(conn, "price_history_default") and conn.execute(text(
+            "SELECT 1 FROM price_history_default WHERE detected_at >= :lo AND detected_at < :hi LIMIT 1"
+        ), {"lo": lo, "hi": hi}).scalar()
+        if detached:
+            conn.execute(text("ALTER TABLE price_history DETACH PARTITION price_history_default"))
+
+        for month in missing:
+            conn.execute(text(
+                f"CREATE TABLE {partition_name(month)} PARTITION OF price_history "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            ))
+
+        if detached:
+            moved = conn.execute(text(
+                "INSERT INTO price_history (id, property_id, price, detected_at) "
+                "SELECT id, property_id, price, detected_at FROM price_history_default "
+                "WHERE detected_at >= :lo AND detected_at < :hi"
+            ), {"lo": lo, "hi": hi}).rowcount
+            # Every month in [lo, hi) has a partition now, so all of these rows were routed
+            conn.execute(text(
+                "DELETE FROM price_history_default WHERE detected_at >= :lo AND detected_at < :hi"
+            ), {"lo": lo, "hi": hi})
+            conn.execute(text("ALTER TABLE price_history ATTACH PARTITION price_history_default DEFAULT"))
+            print(f"🔹 Moved {moved} rows out of price_history_default.")
+
+def partition_price_history(engine, months_ahead: int = 3, drop_legacy: bool = False):
+    """
+    Postgres only: converts price_history into a table range-partitioned by month on detected_at.
+    The old table is kept as price_history_legacy unless drop_legacy is set.
+    """
+    with engine.begin() as conn:
+        if is_partitioned(conn):
+            print("✅ price_history is already partitioned.")
+            return
+
+        # 1. Move the plain table aside (its id sequence is reused by the new table).
+        #    Index names are schema-wide, so the old ones are renamed out of the way.
+        conn.execute(text("ALTER TABLE price_history RENAME TO price_history_legacy"))
+        legacy_indexes = ["price_history_pkey", "ix_price_history_id"] + OBSOLETE_INDEXES
+        legacy_indexes += [name for name, table, _ in INDEXES if table == "price_history"]
+        for name in legacy_indexes:
+            conn.execute(text(f"ALTER INDEX IF EXISTS {name} RENAME TO {name}_legacy"))
+
+        # 2. Partitioned parent - the partition key has to be part of the primary key
+        conn.execute(text(
+            "CREATE TABLE price_history ("
+            " id INTEGER NOT NULL DEFAULT nextval('price_history_id_seq'),"
+            " property_id BIGINT," # Sreality hash_ids exceed INTEGER
+            " price INTEGER,"
+            " detected_at TIMESTAMPTZ NOT NULL DEFAULT now(),"
+            " PRIMARY KEY (id, detected_at)"
+            ") PARTITION BY RANGE (detected_at)"
+        ))
+        conn.execute(text("ALTER SEQUENCE price_history_id_seq OWNED BY price_history.id"))
+        conn.execute(text("CREATE TABLE price_history_default PARTITION OF price_history DEFAULT"))
+        oldest = conn.execute(text("SELECT min(detected_at) FROM price_history_legacy")).scalar()
+
+    # 3. Monthly partitions from the oldest row onwards
+    print("🔹 Creating monthly partitions...")
+    ensure_partitions(engine, months_ahead=months_ahead, start=oldest.date() if oldest else None)
+
+    with engine.begin() as conn:
+        # 4. Copy rows (NULL timestamps get the migration time)
+        print("🔹 Copying rows...")
+        copied = conn.execute(text(
+            "INSERT INTO price_history (id, property_id, price, detected_at) "
+            "SELECT id, property_id, price, COALESCE(detected_at, now()) FROM price_history_legacy"
+        )).rowcount
+        print(f"🔹 Copied {copied} rows.")
+        if drop_legacy:
+            conn.execute(text("DROP TABLE price_history_legacy"))
+
+    # 5. Indexes on the parent cascade to every partition
+    apply_indexes(engine)
+
+
+# Sreality hash_ids exceed INTEGER (models use BigInteger)
+ID_COLUMNS = [("properties", "hash_id"), ("price_history", "property_id")]
+
+
+def widen_id_columns(engine):
+    """
+    Postgres: INTEGER id columns of older databases -> BIGINT
+    (on a partitioned price_history this cascades to the partitions).
+    SQLite integers are 64-bit already.
+    """
+    with engine.begin() as conn:
+        for table, column in ID_COLUMNS:
+            data_type = conn.execute(text(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_name = :table AND column_name = :column"
+            ), {"table": table, "column": column}).scalar()
+            if data_type == "integer":
+                print(f"🔹 {table}.{column} -> BIGINT")
+                conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE BIGINT"))
+
+
+def migrate(url: str, partition: bool = False, months_ahead: int = 3, drop_legacy: bool = False):
+    print(f"🚀 Migrating price history schema: {url.split('@')[-1]}") # Hide password
+    engine = create_engine(url)
+
+    # Fresh databases: tables (and indexes) straight from the models
+    Base.metadata.create_all(engine)
+    apply_indexes(engine)
+    if engine.dialect.name == "postgresql":
+        widen_id_columns(engine)
+
+    if partition:
+        if engine.dialect.name != "postgresql":
+            print("⚠️ Partitioning is Postgres only, skipped.")
+        else:
+            partition_price_history(engine, months_ahead=months_ahead, drop_legacy=drop_legacy)
+    elif engine.dialect.name == "postgresql" and "price_history" in inspect(engine).get_table_names():
+        with engine.connect() as conn:
+            partitioned = is_partitioned(conn)
+        if partitioned:
+            ensure_partitions(engine, months_ahead=months_ahead)
+
+    print("✅ Migration Complete!")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Price history indexes / monthly partitions")
+    parser.add_argument("url", nargs="?", help="Database URL (default: DATABASE_URL / SQLite file)")
+    parser.add_argument("--partition", action="store_true", help="Postgres: convert price_history to monthly partitions")
+    parser.add_argument("--months-ahead", type=int, default=3, help="Future monthly partitions to pre-create")
+    parser.add_argument("--drop-legacy", action="store_true", help="Drop price_history_legacy after copying")
+    args = parser.parse_args()
+
+    migrate(args.url or resolve_database_url(), partition=args.partition,
+            months_ahead=args.months_ahead, drop_legacy=args.drop_legacy)
@@ -0,0 +1,55 @@
+import sys
+import os
+import asyncio
+
+# Add project root to sys.path
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+# Throwaway DB, recorded Sreality responses (Praha apartments, 10 pages x 60)
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+os.environ["SREALITY_REPLAY_PATH"] = os.path.join(BASE_DIR, "fixtures", "sreality_replay.jsonl.gz")
+
+from src.database.session import engine, Base, SessionLocal
+from src.database.models import CrawlWatermark, Property
+from src.harvester.api_engine import SrealityApiEngine
+from src.harvester.cache import get_default_cache
+from src.harvester.incremental import IncrementalCrawler
+
+async def crawl(db):
+    api = SrealityApiEngine() # Default cache: the crawler must still see fresh pages
+    try:
+        return await IncrementalCrawler(api, db).crawl(limit=600, region_id=10, region_type="region")
+    finally:
+        await api.close()
+
+def verify():
+    print("--- 1. Init DB ---")
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+
+    print("--- 2. First Run (full scan) ---")
+    first = asyncio.run(crawl(db))
+    print(f"Pages: {first.pages_fetched}, Emitted: {len(first.emitted)}, Stopped Early: {first.stopped_early}")
+    assert first.pages_fetched == 10
+    assert len(first.emitted) == 600
+    assert not first.stopped_early
+    assert db.query(Property).count() == 600
+    assert db.get(CrawlWatermark, first.query_key) is not None
+
+    print("--- 3. Second Run (nothing changed) ---")
+    second = asyncio.run(crawl(db))
+    print(f"Pages: {second.pages_fetched}, Emitted: {len(second.emitted)}, Stopped Early: {second.stopped_early}")
+    assert second.stopped_early
+    assert second.pages_fetched == 1
+    assert len(second.emitted) == 0
+    cache = get_default_cache()
+    assert cache is None or cache.hits == 0 # Page 1 came from upstream, not the 300 s cache
+    assert db.query(Property).count() == 600
+
+    db.close()
+    print("SUCCESS: Incremental Crawl Verified.")
+
+if __name__ == "__main__":
+    verify()
@@ -7,6 +7,9 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
+# Throwaway DB: the default is now the persistent ria.db
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+
 from src.database.session import engine, Base, SessionLocal
 from src.database.models import Property, PriceHistory
 from src.harvester.ingestion import IngestionService